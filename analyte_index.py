@@ -0,0 +1,190 @@
+import io
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ALIASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analyte_aliases.csv")
+# Environment variable naming a site alias table (same layout as the bundled
+# file) that overrides the bundled aliases wherever no overrides are given
+OVERRIDES_ENV = "GW_ANALYTE_ALIASES"
+
+_CAS_RE = re.compile(r"^\d{2,7}-\d{2}-\d$")
+_TOTAL_RE = re.compile(r"[\s,(]*TOTAL(\s+RECOVERABLE)?\)?$")
+_NON_ALNUM_RE = re.compile(r"[^A-Z0-9]")
+
+
+def normalize_key(name) -> str:
+    """
+    Reduce an analyte name (or CAS number) to its lookup key.
+
+    Case, punctuation, whitespace, footnote markers and a trailing
+    "Total"/"(Total)" qualifier are ignored, so "Arsenic", "Arsenic, Total"
+    and "ARSENIC (TOTAL)" all share the key "ARSENIC". CAS numbers are kept
+    as-is so they never collide with a name.
+    """
+    if name is None or (isinstance(name, float) and np.isnan(name)):
+        return ""
+    text = str(name).strip().upper()
+    if _CAS_RE.match(text):
+        return text
+    text = _TOTAL_RE.sub("", text.rstrip("*").strip())
+    return _NON_ALNUM_RE.sub("", text)
+
+
+class AnalyteIndex:
+    """
+    Hash lookup from normalized analyte names / CAS numbers to canonical names.
+
+    Build it once (see ``get_analyte_index``) and reuse it across runs; each
+    mapping call only touches the unique names in the input.
+    """
+
+    def __init__(self, keys=None):
+        self._keys = dict(keys or {})
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, alias, canonical):
+        key = normalize_key(alias)
+        if key:
+            self._keys[key] = str(canonical).strip()
+        return self
+
+    def canonical(self, name, default=None):
+        return self._keys.get(normalize_key(name), default)
+
+    def with_names(self, names):
+        """
+        Return a copy of the index that also resolves ``names``.
+
+        Names already known keep their canonical form; new ones become their
+        own canonical name. Used to make GWPS table spellings matchable.
+        """
+        extended = AnalyteIndex(self._keys)
+        for name in pd.unique(pd.Series(names, dtype=object).dropna()):
+            key = normalize_key(name)
+            if key and key not in extended._keys:
+                extended._keys[key] = str(name).strip().rstrip("*").strip()
+        return extended
+
+    def _lookup_codes(self, values):
+        # Resolve each unique value once; code -1 (missing) takes the trailing None
+        codes, uniques = pd.factorize(values)
+        resolved = np.array(
+            [self._keys.get(normalize_key(u)) for u in uniques] + [None],
+            dtype=object,
+        )
+        return resolved.take(codes)
+
+    def map_names(self, names, cas=None):
+        """
+        Map a Series of analyte names to canonical names.
+
+        Parameters
+        ----------
+        names : pd.Series
+            Analyte names as reported by the lab
+        cas : pd.Series or None
+            Optional CAS numbers aligned with ``names``, used as a fallback
+            for names the index does not know
+
+        Returns
+        -------
+        tuple[pd.Series, list[str]]
+            Canonical names (unmatched names are passed through stripped)
+            and the sorted list of unmatched names
+        """
+        names = pd.Series(names)
+        canonical = pd.Series(self._lookup_codes(names), index=names.index, dtype=object)
+
+        missing = canonical.isna() & names.notna()
+        if cas is not None and missing.any():
+            cas = pd.Series(cas, index=names.index)[missing]
+            canonical.loc[cas.index] = self._lookup_codes(cas)
+            missing = canonical.isna() & names.notna()
+
+        unmatched = sorted(pd.unique(names[missing].astype(str).str.strip()).tolist())
+        canonical = canonical.where(~missing, names.astype(str).str.strip())
+        canonical = canonical.where(names.notna(), names)
+        return canonical, unmatched
+
+
+def _read_alias_table(source) -> pd.DataFrame:
+    if isinstance(source, pd.DataFrame):
+        df = source
+    elif isinstance(source, str) and source.lower().endswith(".csv"):
+        df = pd.read_csv(source, dtype=str, keep_default_na=False)
+    else:
+        try:
+            df = pd.read_excel(source, dtype=str, keep_default_na=False)
+        except Exception:
+            if hasattr(source, "seek"):
+                source.seek(0)
+            df = pd.read_csv(source, dtype=str, keep_default_na=False)
+    df = df.iloc[:, :2].copy()
+    df.columns = ["Canonical", "Alias"]
+    return df
+
+
+def build_analyte_index(aliases_source=DEFAULT_ALIASES_PATH, overrides=None) -> AnalyteIndex:
+    """
+    Build an analyte index from the bundled alias table plus user overrides.
+
+    Parameters
+    ----------
+    aliases_source : path, buffer, DataFrame or None
+        Alias table with columns (Canonical, Alias); defaults to the bundled
+        ``analyte_aliases.csv``
+    overrides : dict, path, buffer, DataFrame, list of these or None
+        Extra aliases. A dict maps alias -> canonical name; tables use the
+        same two-column layout as the bundled file. Overrides win, later
+        ones in a list over earlier ones.
+
+    Returns
+    -------
+    AnalyteIndex
+    """
+    index = AnalyteIndex()
+
+    tables = []
+    if aliases_source is not None:
+        tables.append(_read_alias_table(aliases_source))
+    for extra in overrides if isinstance(overrides, list) else [overrides]:
+        if isinstance(extra, dict):
+            tables.append(pd.DataFrame({"Canonical": list(extra.values()), "Alias": list(extra.keys())}))
+        elif extra is not None:
+            tables.append(_read_alias_table(extra))
+
+    for table in tables:
+        for canonical, alias in zip(table["Canonical"], table["Alias"]):
+            canonical = str(canonical).strip()
+            if not canonical:
+                continue
+            index.add(canonical, canonical)
+            index.add(alias, canonical)
+
+    return index
+
+
+def get_analyte_index(overrides=None) -> AnalyteIndex:
+    """
+    Return the shared analyte index, built once per overrides table.
+
+    ``overrides`` is a path or the raw bytes of an uploaded alias table
+    (CSV or Excel, columns Canonical, Alias). It is applied on top of the
+    table named by the ``GW_ANALYTE_ALIASES`` environment variable, if set.
+    """
+    return _cached_index(os.environ.get(OVERRIDES_ENV) or None, overrides)
+
+
+@lru_cache(maxsize=8)
+def _cached_index(configured, overrides):
+    tables = [
+        io.BytesIO(table) if isinstance(table, bytes) else table
+        for table in (configured, overrides) if table is not None
+    ]
+    return build_analyte_index(overrides=tables)
@@ -5,6 +5,9 @@ from core import generate_gw_summary
 from max_detection    import max_detection_app
 from format_dataset   import format_dataset_app
 from gwps_analyzer    import gwps_analyzer_app
+from timeseries_chart import timeseries_app
+from plume_map        import plume_map_app
+from preview          import alias_overrides_uploader
 
 # ——— Initialize session state ———
 if 'page' not in st.session_state:
@@ -21,6 +24,13 @@ if st.sidebar.button("⚖️ Max Detection", use_container_width=True):
     st.session_state.page = 'Max Detection'
 if st.sidebar.button("🗂 Format Dataset", use_container_width=True):
     st.session_state.page = 'Format Dataset'
+if st.sidebar.button("📉 Time Series", use_container_width=True):
+    st.session_state.page = 'Time Series'
+if st.sidebar.button("🗺️ Plume Maps", use_container_width=True):
+    st.session_state.page = 'Plume Maps'
+
+# Site alias table shared by every page that matches analyte names
+alias_overrides_uploader()
 
 # ——— Main content ———
 page = st.session_state.page
@@ -35,6 +45,8 @@ if page == 'Home':
     - 🧪 **GWPS Analyzer**: Generate your groundwater protection summary  
     - ⚖️ **Max Detection**: Find the highest non-detect values  
     - 🗂 **Format Dataset**: Tidy up your raw lab output  
+    - 📉 **Time Series**: Plot concentrations over time per well  
+    - 🗺️ **Plume Maps**: Interpolate concentrations between wells  
 
     Get started by clicking one of the navigation buttons.  
     """)
@@ -51,6 +63,14 @@ elif page == 'Format Dataset':
     st.set_page_config(page_title="Format Dataset", layout="wide")
     format_dataset_app()
 
+elif page == 'Time Series':
+    st.set_page_config(page_title="Time Series", layout="wide")
+    timeseries_app()
+
+elif page == 'Plume Maps':
+    st.set_page_config(page_title="Plume Maps", layout="wide")
+    plume_map_app()
+
 # --------------------------------------------------------------
 # 7) Footer Links
 # --------------------------------------------------------------
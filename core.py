@@ -1,67 +1,101 @@
 import pandas as pd
-from io import BytesIO
 
+from analyte_index import get_analyte_index
+from ingest import read_table, detect_layout, guess_id_columns, melt_matrix
 
-def load_data(path_or_buffer, sheet_name=None) -> pd.DataFrame:
+
+def load_data(path_or_buffer, sheet_name=None, sheet_fallback=True) -> pd.DataFrame:
     """
-    Load an Excel file into a cleaned DataFrame.
-    Accepts a file path or file-like buffer.
+    Load an Excel, CSV or Parquet file into a cleaned DataFrame.
+    Accepts a file path, file-like buffer or an already loaded DataFrame.
     Strips whitespace from column headers and returns the DataFrame.
-    If the default sheet yields only one 'Unnamed' column, it switches to the next sheet.
+    If the default Excel sheet yields only one 'Unnamed' column, it switches
+    to the next sheet (unless ``sheet_fallback`` is False).
+    """
+    if isinstance(path_or_buffer, pd.DataFrame):
+        df = path_or_buffer.copy()
+        df.columns = df.columns.astype(str).str.strip()
+        return df
+
+    return read_table(path_or_buffer, sheet_name=sheet_name, sheet_fallback=sheet_fallback)
+
+
+def build_gwps_lookup(gwps_source, analyte_index=None):
     """
-    df = pd.read_excel(
-        path_or_buffer,
-        sheet_name=sheet_name or 0,
-        dtype=str,
-        keep_default_na=False,
+    Build the GWPS lookup (canonical analyte name -> GWPS value).
+
+    Both the GWPS table and lab data are mapped through the same analyte
+    index so spelling variants ("Arsenic, Total", "ARSENIC (TOTAL)", CAS
+    numbers) land on one name. Returns the lookup Series and the index
+    extended with the GWPS table's own names, for mapping lab analytes.
+    """
+    gwps_df = load_data(gwps_source)
+    gwps_df.iloc[:, 0] = gwps_df.iloc[:, 0].astype(str).str.strip()
+    gwps_df.iloc[:, 1] = gwps_df.iloc[:, 1].astype(str).str.strip()
+
+    if analyte_index is None:
+        analyte_index = get_analyte_index()
+    analyte_index = analyte_index.with_names(gwps_df.iloc[:, 0])
+
+    gwps_names, _ = analyte_index.map_names(gwps_df.iloc[:, 0])
+    gwps_lookup = pd.Series(
+        gwps_df.iloc[:, 1].astype(float).values,
+        index=gwps_names.values,
     )
-    df.columns = df.columns.str.strip()
+    gwps_lookup = gwps_lookup[~gwps_lookup.index.duplicated()]
+    return gwps_lookup, analyte_index
 
-    # If only one column or all columns unnamed, try second sheet
-    if len(df.columns) <= 1 or all(col.startswith("Unnamed") for col in df.columns):
-        xls = pd.ExcelFile(path_or_buffer)
-        if len(xls.sheet_names) > 1:
-            df = pd.read_excel(
-                path_or_buffer,
-                sheet_name=xls.sheet_names[1],
-                dtype=str,
-                keep_default_na=False,
-            )
-            df.columns = df.columns.str.strip()
 
-    return df
+X_COLUMN_NAMES = ("x", "easting", "east", "longitude", "lon", "long")
+Y_COLUMN_NAMES = ("y", "northing", "north", "latitude", "lat")
 
 
-def generate_gw_summary(
+def load_wells(wells_source) -> pd.DataFrame:
+    """
+    Load a wells list.
+    The first column holds the well IDs. Optional coordinate columns
+    (X/Y, Easting/Northing or Longitude/Latitude, units in parentheses are
+    ignored) are returned as numeric "X" and "Y" columns for mapping.
+    """
+    # A wells list may be a single column; always read the first sheet
+    wells_df = load_data(wells_source, sheet_fallback=False)
+
+    out = pd.DataFrame({"Well": wells_df.iloc[:, 0].astype(str).str.strip()})
+    for target, names in (("X", X_COLUMN_NAMES), ("Y", Y_COLUMN_NAMES)):
+        for col in wells_df.columns[1:]:
+            if col.lower().split("(")[0].strip() in names:
+                out[target] = pd.to_numeric(wells_df[col], errors="coerce")
+                break
+
+    return out.drop_duplicates("Well").reset_index(drop=True)
+
+
+def prepare_lab_data(
     lab_source,
     gwps_source,
-    output_path=None,
     wells=None,
     wells_source=None,
     sheet_name=None,
+    analyte_index=None,
 ):
     """
-    Generate a groundwater monitoring summary table.
+    Load lab data and the GWPS table and prepare them for comparison.
 
-    Parameters
-    ----------
-    lab_source : path or BytesIO
-        Laboratory analytical data
-    gwps_source : path or BytesIO
-        GWPS table
-    output_path : str or None
-        Optional Excel output path
-    wells : list[str] or None
-        Explicit list of wells (highest priority)
-    wells_source : path or BytesIO or None
-        Optional file containing wells list (first column assumed)
-    sheet_name : str or None
-        Sheet name for lab data
+    Parameters are as for ``generate_gw_summary``.
 
     Returns
     -------
-    pd.DataFrame
-        Summary table
+    lab_df : pd.DataFrame
+        Lab records for the selected wells, with canonical "Analyte" names,
+        a "Client Sample ID" well column and the derived "Is_ND",
+        "Formatted" (reported text, "<DL" for non-detects) and "Effective"
+        (numeric surrogate) columns
+    wells : list[str]
+        Wells in report order
+    gwps_lookup : pd.Series
+        Canonical analyte name -> GWPS value
+    unmatched : list[str]
+        Lab analyte names the index could not resolve
     """
 
     # ------------------------------------------------------------
@@ -70,12 +104,29 @@ def generate_gw_summary(
     lab_df = load_data(lab_source, sheet_name=sheet_name)
     gwps_df = load_data(gwps_source)
 
+    # Wide matrices are melted to long format; matrix cells carry no
+    # reporting limit, so it is recovered from "<DL" results.
+    if detect_layout(lab_df) == "wide":
+        lab_df = melt_matrix(
+            lab_df,
+            id_cols=guess_id_columns(lab_df),
+            var_name="Analyte",
+            value_name="Result",
+        )
+        lab_df["Result"] = lab_df["Result"].astype(str).str.strip()
+        lab_df["High Limit"] = (
+            lab_df["Result"].str.extract(r"^<\s*(.+)$", expand=False).fillna("")
+        )
+
     # ------------------------------------------------------------
     # Detect and standardize Client Sample ID column
     # ------------------------------------------------------------
     sample_cols = [
         c for c in lab_df.columns
         if "client" in c.lower() and "sample" in c.lower()
+    ] or [
+        c for c in lab_df.columns
+        if "well" in c.lower()
     ]
     if not sample_cols:
         raise KeyError(
@@ -93,22 +144,7 @@ def generate_gw_summary(
         wells = [str(w).strip() for w in wells]
 
     elif wells_source is not None:
-        try:
-            if isinstance(wells_source, BytesIO):
-                wells_df = pd.read_excel(wells_source)
-            else:
-                wells_df = pd.read_excel(wells_source)
-        except Exception:
-            wells_df = pd.read_csv(wells_source)
-
-        wells_df.columns = wells_df.columns.str.strip()
-        wells = (
-            wells_df.iloc[:, 0]
-            .astype(str)
-            .str.strip()
-            .unique()
-            .tolist()
-        )
+        wells = load_wells(wells_source)["Well"].tolist()
 
     else:
         wells = sorted(lab_df["Client Sample ID"].unique().tolist())
@@ -133,12 +169,11 @@ def generate_gw_summary(
     # ------------------------------------------------------------
     # Prepare GWPS lookup
     # ------------------------------------------------------------
-    gwps_df.iloc[:, 0] = gwps_df.iloc[:, 0].astype(str).str.strip()
-    gwps_df.iloc[:, 1] = gwps_df.iloc[:, 1].astype(str).str.strip()
+    gwps_lookup, analyte_index = build_gwps_lookup(gwps_df, analyte_index)
 
-    gwps_lookup = pd.Series(
-        gwps_df.iloc[:, 1].astype(float).values,
-        index=gwps_df.iloc[:, 0],
+    lab_df["Analyte"], unmatched = analyte_index.map_names(
+        lab_df["Analyte"],
+        cas=lab_df["CAS"] if "CAS" in lab_df.columns else None,
     )
 
     # ------------------------------------------------------------
@@ -149,18 +184,75 @@ def generate_gw_summary(
         | lab_df["Result"].str.startswith("<")
     )
 
+    # A non-detect without a reporting limit (a bare "ND" matrix cell) has
+    # no numeric surrogate; it is shown as "ND" and left out of Min/GWPS
     lab_df["Formatted"] = lab_df.apply(
-        lambda r: f"<{r['High Limit']}" if r["Is_ND"] else r["Result"],
+        lambda r: (f"<{r['High Limit']}" if r["High Limit"] else "ND")
+        if r["Is_ND"]
+        else r["Result"],
         axis=1,
     )
 
     lab_df["Effective"] = lab_df.apply(
-        lambda r: float(r["High Limit"])
+        lambda r: (float(r["High Limit"]) if r["High Limit"] else float("nan"))
         if r["Is_ND"]
         else float(r["Result"].lstrip("<").strip()),
         axis=1,
     )
 
+    return lab_df, wells, gwps_lookup, unmatched
+
+
+def generate_gw_summary(
+    lab_source,
+    gwps_source,
+    output_path=None,
+    wells=None,
+    wells_source=None,
+    sheet_name=None,
+    analyte_index=None,
+):
+    """
+    Generate a groundwater monitoring summary table.
+
+    Parameters
+    ----------
+    lab_source : path, BytesIO or DataFrame
+        Laboratory analytical data (XLSX/XLS/CSV/Parquet), either long
+        format or a wide well/date x constituent matrix
+    gwps_source : path, BytesIO or DataFrame
+        GWPS table
+    output_path : str or None
+        Optional Excel output path
+    wells : list[str] or None
+        Explicit list of wells (highest priority)
+    wells_source : path or BytesIO or None
+        Optional file containing wells list (first column assumed; any
+        X/Y coordinate columns are ignored here)
+    sheet_name : str or None
+        Sheet name for lab data
+    analyte_index : AnalyteIndex or None
+        Analyte name/CAS index used to match lab analytes to the GWPS table;
+        defaults to the shared index built from ``analyte_aliases.csv`` plus
+        the site alias table named by ``GW_ANALYTE_ALIASES``, if set
+
+    Returns
+    -------
+    pd.DataFrame
+        Summary table. Lab analyte names the index could not resolve are
+        listed in ``attrs["unmatched_analytes"]``; the GWPS of each analyte
+        that has one is in ``attrs["gwps"]``.
+    """
+
+    lab_df, wells, gwps_lookup, unmatched = prepare_lab_data(
+        lab_source,
+        gwps_source,
+        wells=wells,
+        wells_source=wells_source,
+        sheet_name=sheet_name,
+        analyte_index=analyte_index,
+    )
+
     # ------------------------------------------------------------
     # Aggregate per analyte / well
     # ------------------------------------------------------------
@@ -199,17 +291,21 @@ def generate_gw_summary(
         fmt = sub["Formatted"]
         dl = sub["DL"]
 
-        # Min
-        if nd.all():
-            mins.append(f"<{dl.dropna().iloc[0]}")
-        elif nd.any():
-            mins.append(f"<{dl.dropna().iloc[0]}")
+        # Min (reporting limit taken from a non-detect; matrix input has
+        # no limit on detected results, nor on bare "ND" cells)
+        nd_mask = nd.eq(True)
+        if (nd_mask & dl.eq("")).any():
+            # A non-detect without a limit may lie below any reported value
+            mins.append("ND")
+        elif nd_mask.any():
+            mins.append(f"<{dl[nd_mask & dl.ne('')].dropna().iloc[0]}")
         else:
             mins.append(fmt.loc[eff.idxmin()])
 
         # Max
-        if (~nd).any():
-            maxs.append(fmt.loc[eff[~nd].idxmax()])
+        detected = nd.eq(False)
+        if detected.any():
+            maxs.append(fmt.loc[eff[detected].idxmax()])
         else:
             maxs.append("100% ND")
 
@@ -223,6 +319,8 @@ def generate_gw_summary(
     pivot["Min"] = mins
     pivot["Max"] = maxs
     pivot["GWPS Exceedance"] = exc
+    pivot.attrs["unmatched_analytes"] = unmatched
+    pivot.attrs["gwps"] = gwps_lookup.reindex(pivot.index).dropna().to_dict()
 
     # ------------------------------------------------------------
     # Output
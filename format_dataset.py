@@ -1,72 +1,188 @@
 import streamlit as st
 import pandas as pd
 from io import BytesIO
+from ingest import (
+    UPLOAD_TYPES, read_table, coerce_dates, detect_layout, guess_dl_column, guess_id_columns, melt_matrix,
+)
+from matrix_builder import build_matrix, write_table_xlsx, MATRIX_WRITERS, REDUCERS
+from preview import paged_dataframe, paged_matrix, session_analyte_index, session_memo
 
+LONG_COLUMNS = ["Well ID", "Date", "Constituent", "Result"]
+# Optional fifth column: reporting limit of bare "ND" results
+DL_COLUMN = "Reporting Limit"
+NO_DL = "(none)"
+
+
+# Uploads are read as text; the Excel exports turn plain-number results
+# back into numbers (keeping the reported decimals on screen)
 def to_excel(df):
     output = BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        df.to_excel(writer, index=False, sheet_name="Formatted")
+    write_table_xlsx(df, output, sheet_name="Formatted", numeric_text_cols=("Result", DL_COLUMN))
     output.seek(0)
     return output
 
-def to_matrix_excel(df):
+def to_matrix_file(matrix, fmt):
+    writer, mime = MATRIX_WRITERS[fmt]
     output = BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        df.to_excel(writer, index=True, sheet_name="Matrix")
+    if fmt == "xlsx":
+        writer(matrix, output, numeric_text=True)
+    else:
+        writer(matrix, output)
     output.seek(0)
-    return output
+    return output, mime
 
 def format_dataset_app():
     st.header("📊 Format Dataset to Long & Matrix")
 
-    uploaded_file = st.file_uploader("Upload raw lab dataset (Excel or CSV)", type=["xlsx", "xls", "csv"])
+    uploaded_file = st.file_uploader(
+        "Upload raw lab dataset or matrix (Excel, CSV or Parquet)", type=UPLOAD_TYPES
+    )
 
     if uploaded_file:
         try:
-            # Read file depending on type
-            if uploaded_file.name.endswith(".csv"):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
+            df = session_memo("fd_raw", uploaded_file.file_id, lambda: read_table(uploaded_file))
 
             st.success("File uploaded successfully.")
             st.subheader("Step 1: Select Column Headers")
 
+            # Matrices are melted back to long format before column selection
+            layout = st.radio(
+                "Input layout",
+                ["long", "wide"],
+                index=0 if detect_layout(df) == "long" else 1,
+                format_func=lambda x: "Long (one result per row)" if x == "long" else "Matrix (one column per constituent)",
+                horizontal=True,
+            )
+            if layout == "wide":
+                id_cols = st.multiselect(
+                    "Well/date columns (all other columns are constituents)",
+                    list(df.columns),
+                    default=guess_id_columns(df),
+                )
+                df = session_memo(
+                    "fd_melted",
+                    (uploaded_file.file_id, tuple(id_cols)),
+                    lambda: melt_matrix(df, id_cols, var_name="Constituent", value_name="Result"),
+                )
+            else:
+                id_cols = []
+
             well_col = st.selectbox("Select Well ID Column", df.columns)
             date_col = st.selectbox("Select Date Column", df.columns)
             analyte_col = st.selectbox("Select Constituent/Analyte Column", df.columns)
             result_col = st.selectbox("Select Result Column", df.columns)
+            dl_col = _dl_selectbox("Select Reporting Limit Column (optional, for \"ND\" results)", df)
+
+            normalize = st.checkbox("Normalize analyte names (synonyms / CAS numbers)", value=True)
+            analyte_index, overrides_token = session_analyte_index()
+            token = (
+                uploaded_file.file_id, layout, tuple(id_cols),
+                well_col, date_col, analyte_col, result_col, dl_col, normalize, overrides_token,
+            )
+
+            def build_long():
+                long_df = df[[well_col, date_col, analyte_col, result_col]].copy()
+                long_df.columns = LONG_COLUMNS
+                if dl_col != NO_DL:
+                    long_df[DL_COLUMN] = df[dl_col].to_numpy()
+                long_df["Date"] = coerce_dates(long_df["Date"])
+                unmatched = []
+                if normalize:
+                    long_df["Constituent"], unmatched = analyte_index.map_names(long_df["Constituent"])
+                return long_df, unmatched
 
-            long_df = df[[well_col, date_col, analyte_col, result_col]].copy()
-            long_df.columns = ["Well ID", "Date", "Constituent", "Result"]
+            long_df, unmatched = session_memo("fd_long", token, build_long)
+            if unmatched:
+                st.info("ℹ️ Analyte names not found in the alias table: " + ", ".join(unmatched))
+
+            # Shared with the Time Series page
+            st.session_state.long_df = long_df
+            st.session_state.long_df_token = token
 
             st.subheader("Step 2: Preview and Download Long-Format Table")
-            st.dataframe(long_df, use_container_width=True)
+            paged_dataframe(long_df, key="fd_long_preview")
 
             st.download_button(
                 label="📥 Download Long Format Excel",
-                data=to_excel(long_df),
+                data=session_memo("fd_long_xlsx", token, lambda: to_excel(long_df).getvalue()),
                 file_name="long_format_dataset.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             )
 
-            # Generate matrix format (pivot table)
+            # Generate matrix format (sparse, built from integer-coded keys)
             st.subheader("Step 3: Preview and Download Matrix Format Table")
-            matrix_df = long_df.pivot_table(
-                index=["Well ID", "Date"],
-                columns="Constituent",
-                values="Result",
-                aggfunc="first"
-            ).reset_index()
+            col1, col2 = st.columns(2)
+            with col1:
+                reduce = st.selectbox(
+                    "Duplicate results for the same well/date/constituent",
+                    REDUCERS,
+                    help="first/last keep the reported value; min/max pick by numeric value; mean/count aggregate numbers",
+                )
+            with col2:
+                fmt = st.selectbox("Matrix download format", list(MATRIX_WRITERS))
 
-            st.dataframe(matrix_df, use_container_width=True)
+            matrix = session_memo("fd_matrix", (token, reduce), lambda: build_matrix(long_df, reduce=reduce))
+            paged_matrix(matrix, key="fd_matrix_preview")
 
+            matrix_file, mime = session_memo(
+                "fd_matrix_file", (token, reduce, fmt), lambda: to_matrix_file(matrix, fmt)
+            )
             st.download_button(
-                label="📥 Download Matrix Format Excel",
-                data=to_matrix_excel(matrix_df),
-                file_name="matrix_format_dataset.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                label=f"📥 Download Matrix Format {fmt.upper()}",
+                data=matrix_file,
+                file_name=f"matrix_format_dataset.{fmt}",
+                mime=mime,
             )
 
         except Exception as e:
-            st.error(f"Error formatting dataset: {e}")
\ No newline at end of file
+            st.error(f"Error formatting dataset: {e}")
+
+def _dl_selectbox(label, df, key=None):
+    options = [NO_DL] + list(df.columns)
+    guess = DL_COLUMN if DL_COLUMN in df.columns else guess_dl_column(df)
+    return st.selectbox(label, options, index=options.index(guess) if guess in options else 0, key=key)
+
+def long_data_source(key):
+    """
+    Let another page pick its long-format input: the table built on this page
+    (kept in session state) or a fresh long/matrix upload.
+    Returns (long_df, token) where token changes whenever the data does,
+    or (None, None) if nothing is available yet.
+    """
+    sources = ["Upload long-format file"]
+    if "long_df" in st.session_state:
+        sources.insert(0, "Format Dataset (current session)")
+    source = st.radio("Data source", sources, horizontal=True, key=f"{key}_source")
+
+    if source.startswith("Format Dataset"):
+        return st.session_state.long_df, ("format_dataset", st.session_state.get("long_df_token"))
+
+    uploaded_file = st.file_uploader("Upload long-format or matrix data", type=UPLOAD_TYPES, key=f"{key}_upload")
+    if not uploaded_file:
+        st.info("Upload a file, or build a long table on the Format Dataset page first.")
+        return None, None
+
+    df = read_table(uploaded_file)
+    if detect_layout(df) == "wide":
+        df = melt_matrix(df, guess_id_columns(df), var_name="Constituent", value_name="Result")
+
+    selected = tuple(LONG_COLUMNS)
+    if not set(LONG_COLUMNS).issubset(df.columns):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            well_col = st.selectbox("Well ID Column", df.columns, key=f"{key}_well")
+        with col2:
+            date_col = st.selectbox("Date Column", df.columns, key=f"{key}_date")
+        with col3:
+            analyte_col = st.selectbox("Constituent Column", df.columns, key=f"{key}_analyte")
+        with col4:
+            result_col = st.selectbox("Result Column", df.columns, key=f"{key}_result")
+        selected = (well_col, date_col, analyte_col, result_col)
+    dl_col = _dl_selectbox("Reporting Limit Column (for \"ND\" results)", df, key=f"{key}_dl")
+
+    long_df = df[list(selected)].copy()
+    long_df.columns = LONG_COLUMNS
+    if dl_col != NO_DL:
+        long_df[DL_COLUMN] = df[dl_col].to_numpy()
+    selected += (dl_col,)
+    return long_df, ("upload", uploaded_file.file_id, selected)
@@ -1,4 +1,4 @@
 # gw_summary/__init__.py
 
-
-from .core import generate_gw_summary
\ No newline at end of file
+# Package alias for the top-level summary engine (core.py)
+from core import generate_gw_summary, prepare_lab_data
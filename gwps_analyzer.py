@@ -1,9 +1,12 @@
 # app.py
 
 import streamlit as st
-import pandas as pd
 import io
 from core import generate_gw_summary
+from ingest import UPLOAD_TYPES
+from preview import paged_dataframe, session_analyte_index, session_memo
+from report_bundle import BUNDLE_FORMATS, generate_report_bundle
+from summary_workbook import write_summary_workbook
 
 st.set_page_config(page_title="GW Analyzer", layout="wide")
 
@@ -76,18 +79,18 @@ def gwps_analyzer_app():
     col1, col2, col3 = st.columns([1,1,1])
 
     with col1:
-        st.markdown("#### 1. Upload Lab Data (.xlsx/.xls)")
+        st.markdown("#### 1. Upload Lab Data (.xlsx/.xls/.csv/.parquet, long or matrix)")
         lab_file = st.file_uploader(
             label="",
-            type=["xlsx", "xls"],
+            type=UPLOAD_TYPES,
             key="lab"
         )
 
     with col2:
-        st.markdown("#### 2. Upload GWPS Table (.xlsx/.xls)")
+        st.markdown("#### 2. Upload GWPS Table (.xlsx/.xls/.csv/.parquet)")
         gwps_file = st.file_uploader(
             label="",
-            type=["xlsx", "xls"],
+            type=UPLOAD_TYPES,
             key="gwps"
         )
 
@@ -95,7 +98,7 @@ def gwps_analyzer_app():
         st.markdown("#### 3. Upload Wells List (optional)")
         wells_file = st.file_uploader(
             label="",
-            type=["xlsx", "xls", "csv"],
+            type=UPLOAD_TYPES,
             key="wells"
         )
 
@@ -121,32 +124,87 @@ def gwps_analyzer_app():
                     output_path=None,
                     wells=None,
                     wells_source=wells_buffer,
-                    sheet_name=None
+                    sheet_name=None,
+                    analyte_index=session_analyte_index()[0],
                 )
 
-                st.success("✅ Summary generated below!")
-                # --------------------------------------------------------------
-                # 5) Display for copy/paste
-                # --------------------------------------------------------------
-                st.markdown("#### Summary Table (copy/paste below)")
-                st.dataframe(df_summary, use_container_width=True)
-
-                # --------------------------------------------------------------
-                # 6) Download as Excel
-                # --------------------------------------------------------------
-                excel_buffer = io.BytesIO()
-                with pd.ExcelWriter(excel_buffer, engine="openpyxl") as writer:
-                    df_summary.to_excel(writer, index=True, sheet_name="Summary")
-                excel_buffer.seek(0)
-
-                st.download_button(
-                    label="📥 Download Summary as Excel",
-                    data=excel_buffer,
-                    file_name="GW_Summary.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+                # Kept in session state so paging the preview does not
+                # require re-running the summary; the run number keys the
+                # cached workbook
+                st.session_state.gwps_runs = st.session_state.get("gwps_runs", 0) + 1
+                st.session_state.gwps_summary = (st.session_state.gwps_runs, df_summary)
+                st.session_state.pop("gwps_bundle", None)
 
             except Exception as e:
+                st.session_state.pop("gwps_summary", None)
                 st.error(f"Error generating summary: {e}")
 
+    if "gwps_summary" in st.session_state:
+        run, df_summary = st.session_state.gwps_summary
+        st.success("✅ Summary generated below!")
+
+        unmatched = df_summary.attrs.get("unmatched_analytes", [])
+        if unmatched:
+            st.info("ℹ️ Analyte names not found in the alias or GWPS table: " + ", ".join(unmatched))
+        # --------------------------------------------------------------
+        # 5) Display for copy/paste
+        # --------------------------------------------------------------
+        paged_dataframe(df_summary, key="gwps_summary_preview", title="#### Summary Table (copy/paste below)")
+
+        # --------------------------------------------------------------
+        # 6) Download as Excel
+        # --------------------------------------------------------------
+        # Styled workbook: exceedance / ND / qualifier highlighting, GWPS
+        # column, frozen headers and a Notes sheet
+        def summary_xlsx():
+            return write_summary_workbook(df_summary, io.BytesIO()).getvalue()
+
+        st.download_button(
+            label="📥 Download Summary as Excel",
+            data=session_memo("gwps_summary_xlsx", run, summary_xlsx),
+            file_name="GW_Summary.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+
+        # --------------------------------------------------------------
+        # 7) Per-well / per-analyte report bundle
+        # --------------------------------------------------------------
+        st.markdown("#### Report Bundle")
+        col1, col2 = st.columns(2)
+        with col1:
+            bundle_by = st.multiselect("One report per", ["well", "analyte"], default=["well", "analyte"])
+        with col2:
+            bundle_fmt = st.radio("Report format", BUNDLE_FORMATS, horizontal=True)
+
+        if st.button("🗂️ Build Report Bundle"):
+            if not lab_file or not gwps_file or not bundle_by:
+                st.error("Upload Lab Data and GWPS files and pick at least one report type.")
+            else:
+                try:
+                    with st.spinner("Writing reports..."):
+                        zip_buffer = io.BytesIO()
+                        manifest = generate_report_bundle(
+                            lab_source=io.BytesIO(lab_file.getvalue()),
+                            gwps_source=io.BytesIO(gwps_file.getvalue()),
+                            output=zip_buffer,
+                            wells_source=io.BytesIO(wells_file.getvalue()) if wells_file else None,
+                            analyte_index=session_analyte_index()[0],
+                            by=tuple(bundle_by),
+                            fmt=bundle_fmt,
+                        )
+                    st.session_state.gwps_bundle = (zip_buffer.getvalue(), manifest)
+                except Exception as e:
+                    st.session_state.pop("gwps_bundle", None)
+                    st.error(f"Error building report bundle: {e}")
+
+        if "gwps_bundle" in st.session_state:
+            zip_bytes, manifest = st.session_state.gwps_bundle
+            st.caption(f"{len(manifest):,} files · {len(zip_bytes) / 1e6:,.1f} MB")
+            st.download_button(
+                label="📥 Download Report Bundle (ZIP)",
+                data=zip_bytes,
+                file_name="GW_Reports.zip",
+                mime="application/zip"
+            )
+
     st.markdown("---")
@@ -0,0 +1,216 @@
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+UPLOAD_TYPES = ["xlsx", "xls", "csv", "parquet"]
+
+# Header fragments that mark a column as an identifier rather than a constituent
+ID_COLUMN_HINTS = ("well", "sample", "location", "station", "date", "event", "time")
+# Whole header names (optionally followed by a suffix such as "Name") that
+# mark a long table's analyte column. Matched word by word so matrix
+# constituents like "Chemical Oxygen Demand" are not mistaken for one.
+ANALYTE_COLUMN_NAMES = ("analyte", "analytes", "constituent", "parameter", "chemical", "compound")
+ANALYTE_COLUMN_SUFFIXES = ("name", "id", "code", "description")
+# Header names of a reporting/detection limit column in long lab data
+DL_COLUMN_NAMES = ("high limit", "reporting limit", "detection limit", "dl", "rl", "mdl", "pql")
+
+_MAGIC = (
+    (b"PK\x03\x04", "xlsx"),
+    (b"\xd0\xcf\x11\xe0", "xls"),
+    (b"PAR1", "parquet"),
+)
+
+
+def sniff_format(source, name=None) -> str:
+    """
+    Work out whether a path or buffer holds XLSX, XLS, CSV or Parquet data.
+
+    The file extension wins when there is one (``name`` or the ``.name`` of an
+    uploaded file); otherwise the first bytes of the buffer are inspected.
+    """
+    name = name or (source if isinstance(source, str) else getattr(source, "name", None))
+    if name:
+        ext = os.path.splitext(str(name))[1].lower()
+        if ext in (".xlsx", ".xlsm"):
+            return "xlsx"
+        if ext in (".xls", ".csv", ".parquet"):
+            return ext[1:]
+        if ext == ".pq":
+            return "parquet"
+
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            head = f.read(8)
+    else:
+        pos = source.tell()
+        head = source.read(8)
+        source.seek(pos)
+
+    for magic, fmt in _MAGIC:
+        if head.startswith(magic):
+            return fmt
+    return "csv"
+
+
+def _read_excel(source, sheet_name=None, sheet_fallback=True) -> pd.DataFrame:
+    df = pd.read_excel(
+        source,
+        sheet_name=sheet_name or 0,
+        dtype=str,
+        keep_default_na=False,
+    )
+    df.columns = df.columns.astype(str).str.strip()
+
+    # If only one column or all columns unnamed, try second sheet
+    if sheet_fallback and (len(df.columns) <= 1 or all(col.startswith("Unnamed") for col in df.columns)):
+        xls = pd.ExcelFile(source)
+        if len(xls.sheet_names) > 1:
+            df = pd.read_excel(
+                source,
+                sheet_name=xls.sheet_names[1],
+                dtype=str,
+                keep_default_na=False,
+            )
+            df.columns = df.columns.astype(str).str.strip()
+
+    return df
+
+
+def _read_csv(source) -> pd.DataFrame:
+    # pyarrow parses large CSVs on several threads. Every column is declared
+    # as string up front so values like "0.0020" keep their reported text;
+    # fall back to the C parser when pyarrow is unavailable or rejects the file.
+    pos = None if isinstance(source, str) else source.tell()
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError:
+        return pd.read_csv(source, dtype=str, keep_default_na=False)
+
+    try:
+        names = pa_csv.open_csv(source).schema.names
+        if pos is not None:
+            source.seek(pos)
+        table = pa_csv.read_csv(
+            source,
+            convert_options=pa_csv.ConvertOptions(
+                column_types={name: pa.string() for name in names},
+                null_values=[],
+                strings_can_be_null=False,
+            ),
+        )
+        return table.to_pandas()
+    except pa.ArrowInvalid:
+        if pos is not None:
+            source.seek(pos)
+        return pd.read_csv(source, dtype=str, keep_default_na=False)
+
+
+def _read_parquet(source) -> pd.DataFrame:
+    df = pd.read_parquet(source)
+    return df.astype(str).where(df.notna(), "")
+
+
+def read_table(source, name=None, sheet_name=None, sheet_fallback=True) -> pd.DataFrame:
+    """
+    Read an XLSX, XLS, CSV or Parquet file into an all-string DataFrame.
+
+    Parameters
+    ----------
+    source : path or file-like
+        File to read
+    name : str or None
+        Optional file name used to pick the format (e.g. for bare BytesIO)
+    sheet_name : str or None
+        Sheet name for Excel files
+    sheet_fallback : bool
+        Switch to the second Excel sheet when the first has at most one
+        (named) column. Off for tables that legitimately have one column,
+        such as wells lists.
+
+    Returns
+    -------
+    pd.DataFrame
+        Table with stripped headers and blanks as empty strings
+    """
+    fmt = sniff_format(source, name=name)
+    if fmt in ("xlsx", "xls"):
+        return _read_excel(source, sheet_name=sheet_name, sheet_fallback=sheet_fallback)
+    if fmt == "parquet":
+        df = _read_parquet(source)
+    else:
+        df = _read_csv(source)
+    df.columns = df.columns.astype(str).str.strip()
+    return df
+
+
+def coerce_dates(values) -> pd.Series:
+    """
+    Parse a text date column, leaving it untouched unless every non-blank value parses.
+    """
+    values = pd.Series(values)
+    parsed = pd.to_datetime(values.replace("", None), errors="coerce", format="mixed")
+    if parsed.notna().sum() == (values.notna() & values.astype(str).str.strip().ne("")).sum():
+        return parsed
+    return values
+
+
+def detect_layout(df) -> str:
+    """
+    Return "long" if the table has an analyte column, otherwise "wide".
+    """
+    for col in df.columns:
+        words = re.findall(r"[a-z]+", str(col).lower())
+        if (
+            words
+            and words[0] in ANALYTE_COLUMN_NAMES
+            and all(w in ANALYTE_COLUMN_SUFFIXES for w in words[1:])
+        ):
+            return "long"
+    return "wide"
+
+
+def guess_id_columns(df) -> list:
+    """
+    Columns of a wide matrix that identify the sample rather than a constituent.
+    """
+    return [
+        col for col in df.columns
+        if any(hint in str(col).lower() for hint in ID_COLUMN_HINTS)
+    ]
+
+
+def guess_dl_column(df):
+    """
+    The column holding non-detect reporting limits, or None if there is none.
+    """
+    for col in df.columns:
+        if " ".join(re.findall(r"[a-z]+", str(col).lower())) in DL_COLUMN_NAMES:
+            return col
+    return None
+
+
+def melt_matrix(df, id_cols, var_name="Constituent", value_name="Result", dropna=True) -> pd.DataFrame:
+    """
+    Reshape a wide matrix (one column per constituent) into long format.
+
+    The value block is flattened row-major in one step and the id columns
+    are repeated to match, which avoids the per-column work of ``pd.melt``.
+    Blank cells are dropped unless ``dropna`` is False.
+    """
+    id_cols = list(id_cols)
+    value_cols = [c for c in df.columns if c not in id_cols]
+    n_rows, n_values = len(df), len(value_cols)
+
+    values = df[value_cols].to_numpy(dtype=object).ravel()
+    data = {col: np.repeat(df[col].to_numpy(), n_values) for col in id_cols}
+    data[var_name] = np.tile(np.asarray(value_cols, dtype=object), n_rows)
+    data[value_name] = values
+    long_df = pd.DataFrame(data)
+
+    if dropna:
+        keep = pd.notna(values) & (values != "")
+        long_df = long_df[keep].reset_index(drop=True)
+    return long_df
@@ -0,0 +1,344 @@
+import csv
+import io
+import re
+
+import numpy as np
+import pandas as pd
+
+REDUCERS = ("first", "last", "min", "max", "mean", "count")
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def _factorize(values):
+    # Sorted codes give the same row/column order as pivot_table; fall back to
+    # appearance order when the column mixes types that cannot be compared.
+    try:
+        return pd.factorize(values, sort=True)
+    except TypeError:
+        return pd.factorize(values, sort=False)
+
+
+class SparseMatrix:
+    """
+    Well/date x constituent matrix stored as coordinates instead of a dense frame.
+
+    ``rows``/``cols`` are integer codes into ``row_keys``/``columns`` and are
+    sorted by row, so any block of rows can be sliced out with a binary
+    search and densified on its own.
+    """
+
+    def __init__(self, row_keys, columns, rows, cols, values):
+        self.row_keys = row_keys
+        self.columns = columns
+        self.rows = rows
+        self.cols = cols
+        self.values = values
+
+    @property
+    def shape(self):
+        return len(self.row_keys), len(self.columns)
+
+    @property
+    def nnz(self):
+        return len(self.values)
+
+    @property
+    def density(self):
+        n_rows, n_cols = self.shape
+        return self.nnz / (n_rows * n_cols) if n_rows and n_cols else 0.0
+
+    def block(self, start, stop) -> pd.DataFrame:
+        """
+        Densify rows ``start:stop`` into a DataFrame (key columns first).
+        """
+        stop = min(stop, len(self.row_keys))
+        lo, hi = np.searchsorted(self.rows, [start, stop])
+
+        numeric = self.values.dtype.kind == "f"
+        dense = np.full(
+            (stop - start, len(self.columns)),
+            np.nan if numeric else None,
+            dtype=self.values.dtype if numeric else object,
+        )
+        dense[self.rows[lo:hi] - start, self.cols[lo:hi]] = self.values[lo:hi]
+
+        keys = self.row_keys.iloc[start:stop].reset_index(drop=True)
+        values = pd.DataFrame(dense, columns=self.columns)
+        return pd.concat([keys, values], axis=1)
+
+    def iter_blocks(self, block_rows=5000):
+        for start in range(0, len(self.row_keys), block_rows):
+            yield self.block(start, start + block_rows)
+
+    def head(self, n=100) -> pd.DataFrame:
+        return self.block(0, n)
+
+
+def build_matrix(
+    long_df,
+    index_cols=("Well ID", "Date"),
+    column_col="Constituent",
+    value_col="Result",
+    reduce="first",
+) -> SparseMatrix:
+    """
+    Build a sparse matrix from a long-format table.
+
+    Parameters
+    ----------
+    long_df : pd.DataFrame
+        Long-format data
+    index_cols : sequence of str
+        Columns identifying a matrix row
+    column_col : str
+        Column whose values become matrix columns
+    value_col : str
+        Column holding the cell values
+    reduce : str
+        Rule for duplicate (row, column) entries: "first"/"last" keep the
+        value as reported; "min"/"max" keep the reported text of the smallest
+        or largest numeric value (first value if none parse); "mean"/"count"
+        return numbers computed over the numeric values
+
+    Returns
+    -------
+    SparseMatrix
+    """
+    if reduce not in REDUCERS:
+        raise ValueError(f"Unknown duplicate rule '{reduce}'. Choose one of {REDUCERS}.")
+    index_cols = list(index_cols)
+
+    # ------------------------------------------------------------
+    # Factorize keys into integer codes
+    # ------------------------------------------------------------
+    values = long_df[value_col]
+    valid = values.notna().to_numpy()
+
+    row_code = np.zeros(len(long_df), dtype=np.int64)
+    for col in index_cols:
+        codes, uniques = _factorize(long_df[col])
+        valid &= codes >= 0
+        row_code = row_code * len(uniques) + codes
+        # Re-compact after every column so the combined code cannot overflow
+        row_code, _ = pd.factorize(row_code, sort=True)
+        row_code = row_code.astype(np.int64)
+
+    col_code, columns = _factorize(long_df[column_col])
+    valid &= col_code >= 0
+
+    positions = np.flatnonzero(valid)
+    row_code, _ = pd.factorize(row_code[positions], sort=True)
+    col_code = col_code[positions]
+    n_rows, n_cols = int(row_code.max()) + 1 if len(row_code) else 0, len(columns)
+
+    # One representative source row per matrix row to recover the key values
+    first_pos = np.empty(n_rows, dtype=np.int64)
+    first_pos[row_code[::-1]] = positions[::-1]
+    row_keys = long_df[index_cols].iloc[first_pos].reset_index(drop=True)
+
+    vals = values.to_numpy()[positions]
+    if vals.dtype == object:
+        vals = np.array([v if isinstance(v, str) else str(v) for v in vals], dtype=object)
+
+    # ------------------------------------------------------------
+    # Collapse duplicate cells with a single stable sort
+    # ------------------------------------------------------------
+    cell = row_code.astype(np.int64) * n_cols + col_code
+
+    if reduce in ("min", "max"):
+        # Sort by numeric value inside each cell so min/max keep the original
+        # text; non-numeric entries sort last and only win when nothing parses.
+        numeric = pd.to_numeric(pd.Series(vals), errors="coerce").to_numpy(dtype=float)
+        rank = numeric if reduce == "min" else -numeric
+        order = np.lexsort((np.where(np.isnan(rank), np.inf, rank), cell))
+    else:
+        order = np.argsort(cell, kind="stable")
+
+    cell_sorted = cell[order]
+    is_first = np.r_[True, cell_sorted[1:] != cell_sorted[:-1]] if len(cell) else np.zeros(0, dtype=bool)
+    unique_cells = cell_sorted[is_first]
+
+    if reduce == "last":
+        out = vals[order[np.r_[is_first[1:], True]]] if len(cell) else vals
+    else:
+        out = vals[order[is_first]]
+
+    if reduce in ("mean", "count"):
+        numeric = pd.to_numeric(pd.Series(vals), errors="coerce")
+        out = numeric.groupby(cell).agg(reduce).reindex(unique_cells).to_numpy(dtype=float)
+
+    return SparseMatrix(
+        row_keys=row_keys,
+        columns=pd.Index(columns, name=column_col),
+        rows=unique_cells // n_cols if n_cols else unique_cells,
+        cols=unique_cells % n_cols if n_cols else unique_cells,
+        values=out,
+    )
+
+
+# ------------------------------------------------------------
+# Streaming writers
+# ------------------------------------------------------------
+def write_matrix_csv(matrix, output, block_rows=5000):
+    """
+    Stream the matrix to a binary file-like object as UTF-8 CSV.
+    """
+    text = io.TextIOWrapper(output, encoding="utf-8", newline="", write_through=True)
+    csv.writer(text, lineterminator="\n").writerow(list(matrix.row_keys.columns) + list(matrix.columns))
+    for block in matrix.iter_blocks(block_rows):
+        block.to_csv(text, header=False, index=False)
+    text.detach()
+    return output
+
+
+def _xlsx_cell_writer(worksheet, dtype, date_fmt):
+    # Dates as Excel dates, numbers as numbers; everything else is written
+    # as the reported text so IDs like "0101" and results like "0.0020"
+    # keep their leading/trailing zeros.
+    if dtype.kind == "M":
+        return lambda row, col, value: worksheet.write_datetime(row, col, value.to_pydatetime(), date_fmt)
+    if dtype.kind in "iuf":
+        return lambda row, col, value: worksheet.write_number(row, col, value)
+    if dtype.kind == "b":
+        return lambda row, col, value: worksheet.write_boolean(row, col, value)
+    return lambda row, col, value: worksheet.write_string(row, col, str(value))
+
+
+_PLAIN_NUMBER = re.compile(r"^[+-]?(\d+)(?:\.(\d+))?$")
+
+
+def _numeric_text_writer(workbook, worksheet):
+    # Text that is a plain number is written as a number, with a display
+    # format showing the reported decimals ("0.0020" stays 0.0020 on screen);
+    # "<DL", "ND", qualifiers and IDs with leading zeros stay text.
+    formats = {}
+
+    def write(row, col, value):
+        text = str(value).strip()
+        match = _PLAIN_NUMBER.match(text)
+        if match is None or (len(match.group(1)) > 1 and match.group(1).startswith("0")):
+            return worksheet.write_string(row, col, text)
+        decimals = len(match.group(2) or "")
+        if decimals not in formats:
+            formats[decimals] = workbook.add_format({"num_format": "0." + "0" * decimals if decimals else "0"})
+        return worksheet.write_number(row, col, float(text), formats[decimals])
+
+    return write
+
+
+def write_matrix_xlsx(matrix, output, sheet_name="Matrix", numeric_text=False):
+    """
+    Stream the matrix to XLSX with xlsxwriter in constant-memory mode.
+
+    Only the stored cells are visited: each row writes its key cells and
+    then the slice of ``rows``/``cols``/``values`` that belongs to it.
+    Text values are written as reported unless ``numeric_text`` is True, in
+    which case plain numbers become Excel numbers that display the reported
+    decimals. Key columns always keep their text.
+    """
+    import xlsxwriter
+
+    if len(matrix.row_keys) + 1 > EXCEL_MAX_ROWS:
+        raise ValueError(
+            f"Matrix has {len(matrix.row_keys):,} rows, more than Excel allows. Use CSV or Parquet instead."
+        )
+
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True, "in_memory": False})
+    worksheet = workbook.add_worksheet(sheet_name)
+    date_fmt = workbook.add_format({"num_format": "yyyy-mm-dd hh:mm"})
+
+    n_keys = len(matrix.row_keys.columns)
+    header = list(matrix.row_keys.columns) + [str(c) for c in matrix.columns]
+    for col, name in enumerate(header):
+        worksheet.write_string(0, col, str(name))
+    worksheet.freeze_panes(1, n_keys)
+
+    keys = [
+        (_xlsx_cell_writer(worksheet, matrix.row_keys[c].dtype, date_fmt), matrix.row_keys[c].tolist())
+        for c in matrix.row_keys.columns
+    ]
+    if numeric_text and matrix.values.dtype == object:
+        write_value = _numeric_text_writer(workbook, worksheet)
+    else:
+        write_value = _xlsx_cell_writer(worksheet, matrix.values.dtype, date_fmt)
+    numeric = matrix.values.dtype.kind == "f"
+
+    n_rows = len(matrix.row_keys)
+    bounds = np.searchsorted(matrix.rows, np.arange(n_rows + 1))
+    cols = (matrix.cols + n_keys).tolist()
+    values = matrix.values.tolist()
+
+    for r in range(n_rows):
+        row = r + 1
+        for col, (write_key, key_values) in enumerate(keys):
+            if not pd.isna(key_values[r]):
+                write_key(row, col, key_values[r])
+        for i in range(bounds[r], bounds[r + 1]):
+            value = values[i]
+            if value is None or (numeric and value != value):
+                continue
+            write_value(row, cols[i], value)
+
+    workbook.close()
+    return output
+
+
+def write_table_xlsx(df, output, sheet_name="Sheet1", numeric_text_cols=()):
+    """
+    Write a flat table to XLSX in constant-memory mode.
+
+    Columns are written by dtype as in ``write_matrix_xlsx``; the
+    ``numeric_text_cols`` text columns get the plain-number conversion.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True, "in_memory": False})
+    worksheet = workbook.add_worksheet(sheet_name)
+    date_fmt = workbook.add_format({"num_format": "yyyy-mm-dd hh:mm"})
+    numeric_text = _numeric_text_writer(workbook, worksheet)
+
+    for col, name in enumerate(df.columns):
+        worksheet.write_string(0, col, str(name))
+    worksheet.freeze_panes(1, 0)
+
+    columns = [
+        (numeric_text if c in numeric_text_cols and df[c].dtype == object
+         else _xlsx_cell_writer(worksheet, df[c].dtype, date_fmt), df[c].tolist())
+        for c in df.columns
+    ]
+    for r in range(len(df)):
+        for col, (write, values) in enumerate(columns):
+            value = values[r]
+            if value is not None and not (isinstance(value, str) and value == "") and not pd.isna(value):
+                write(r + 1, col, value)
+
+    workbook.close()
+    return output
+
+
+def write_matrix_parquet(matrix, output, block_rows=50000):
+    """
+    Stream the matrix to Parquet, one row group per block.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {"f": pa.float64(), "i": pa.int64(), "u": pa.uint64(), "b": pa.bool_()}
+    value_type = arrow_types.get(matrix.values.dtype.kind, pa.string())
+    key_schema = pa.Schema.from_pandas(matrix.row_keys, preserve_index=False)
+    schema = pa.schema(
+        list(key_schema) + [pa.field(str(c), value_type) for c in matrix.columns]
+    )
+
+    with pq.ParquetWriter(output, schema) as writer:
+        for block in matrix.iter_blocks(block_rows):
+            block.columns = schema.names
+            writer.write_table(pa.Table.from_pandas(block, schema=schema, preserve_index=False))
+    return output
+
+
+MATRIX_WRITERS = {
+    "xlsx": (write_matrix_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": (write_matrix_csv, "text/csv"),
+    "parquet": (write_matrix_parquet, "application/octet-stream"),
+}
@@ -2,18 +2,35 @@
 import streamlit as st
 import pandas as pd
 from core import load_data
-from max_min_analysis import analyze_max_min_nd
+from ingest import UPLOAD_TYPES, detect_layout, guess_id_columns, melt_matrix
+from max_min_analysis import nd_constituents, rank_detections
+from preview import paged_dataframe, session_analyte_index
 
 def max_detection_app():
     st.title("📈 Max Detection Summary Tool")
 
-    uploaded_file = st.file_uploader("📥 Upload lab data file", type=["xlsx"])
+    uploaded_file = st.file_uploader("📥 Upload lab data file (long or matrix layout)", type=UPLOAD_TYPES)
 
     if uploaded_file:
         try:
             df = load_data(uploaded_file)
             st.success("✅ File loaded successfully.")
 
+            layout = st.radio(
+                "Input layout",
+                ["long", "wide"],
+                index=0 if detect_layout(df) == "long" else 1,
+                format_func=lambda x: "Long (one result per row)" if x == "long" else "Matrix (one column per constituent)",
+                horizontal=True,
+            )
+            if layout == "wide":
+                id_cols = st.multiselect(
+                    "Well/date columns (all other columns are constituents)",
+                    list(df.columns),
+                    default=guess_id_columns(df),
+                )
+                df = melt_matrix(df, id_cols, var_name="Analyte", value_name="Result")
+
             st.markdown("### 🔧 Select Columns")
             col1, col2 = st.columns(2)
 
@@ -25,17 +42,33 @@ def max_detection_app():
                 result_col = st.selectbox("Result Column", df.columns)
                 date_col = st.selectbox("Date Column", df.columns)
 
+            normalize = st.checkbox("Normalize analyte names (synonyms / CAS numbers)", value=True)
+            top_n = st.number_input("Top-N detections per constituent", min_value=1, max_value=100, value=5)
+
             if st.button("🚀 Run Max/Min Detection Summary"):
-                summary_df, nd_only = analyze_max_min_nd(
+                # Summary and ranking views come from one sort over all detections
+                views = rank_detections(
                     df,
                     well_col=well_col,
                     analyte_col=analyte_col,
                     result_col=result_col,
-                    date_col=date_col
+                    date_col=date_col,
+                    top_n=int(top_n),
+                    analyte_index=session_analyte_index()[0] if normalize else None
                 )
+                summary_df = views.pop("summary")
+                nd_only = nd_constituents(summary_df)
+
+                # Kept in session state so paging the previews does not
+                # require re-running the analysis
+                st.session_state.max_detection = (uploaded_file.file_id, summary_df, nd_only, views, int(top_n))
+
+            results = st.session_state.get("max_detection")
+            if results and results[0] == uploaded_file.file_id:
+                _, summary_df, nd_only, views, top_n = results
 
                 st.subheader("📊 Summary Table")
-                st.dataframe(summary_df, use_container_width=True)
+                paged_dataframe(summary_df, key="max_summary_preview")
 
                 if nd_only:
                     nd_statement = (
@@ -48,6 +81,10 @@ def max_detection_app():
                 st.markdown("### ND Summary")
                 st.markdown(nd_statement)
 
+                unmatched = summary_df.attrs.get("unmatched_analytes", [])
+                if unmatched:
+                    st.info("ℹ️ Analyte names not found in the alias table: " + ", ".join(unmatched))
+
                 st.download_button(
                     "📥 Download as CSV",
                     summary_df.to_csv(index=False),
@@ -55,5 +92,18 @@ def max_detection_app():
                     mime="text/csv"
                 )
 
+                st.subheader("🏆 Detection Rankings")
+                tabs = st.tabs([f"Top {top_n} per Constituent", "Max per Well", "Detection Frequency"])
+                for tab, (key, view) in zip(tabs, views.items()):
+                    with tab:
+                        paged_dataframe(view, key=f"max_{key}_preview")
+                        st.download_button(
+                            "📥 Download as CSV",
+                            view.to_csv(index=False),
+                            file_name=f"max_detection_{key}.csv",
+                            mime="text/csv",
+                            key=f"download_{key}"
+                        )
+
         except Exception as e:
             st.error(f"❌ Error: {e}")
\ No newline at end of file
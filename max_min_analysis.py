@@ -1,69 +1,142 @@
+import numpy as np
 import pandas as pd
 
-def analyze_max_min_nd(df, well_col, analyte_col, result_col, date_col):
+def analyze_max_min_nd(df, well_col, analyte_col, result_col, date_col, analyte_index=None):
+    """
+    Max / min detection per constituent and the 100% non-detect constituents.
+
+    Thin wrapper over ``rank_detections``: the summary is read off the same
+    sort as the ranking views. Returns ``(summary_df, nd_constituents)``.
+    """
+    summary = rank_detections(
+        df, well_col, analyte_col, result_col, date_col, analyte_index=analyte_index
+    )["summary"]
+    return summary, nd_constituents(summary)
+
+def nd_constituents(summary):
+    """
+    Constituents flagged 100% ND in a ``rank_detections`` summary.
+    """
+    return summary.loc[summary["100% NDs"].eq("Yes"), "Constituent"].tolist()
+
+def rank_detections(df, well_col, analyte_col, result_col, date_col, top_n=5, analyte_index=None):
+    """
+    Build the per-analyte ranking views from a single sort of the detections.
+
+    Returns a dict of DataFrames:
+      - "summary": max and min detection per constituent (value, well, date)
+        and the 100% non-detect constituents; unmatched analyte names are in
+        ``attrs["unmatched_analytes"]``
+      - "top_n": the ``top_n`` highest detections per constituent
+      - "well_max": the maximum detection per (well, constituent) with counts
+      - "frequency": samples, detections and detection frequency per constituent
+    """
+    df = df.copy()
     df.columns = df.columns.str.strip()
 
-    # Strip and uppercase the result column for consistent parsing
-    df[result_col] = df[result_col].astype(str).str.strip()
-    df['ND Flag'] = df[result_col].str.upper() == 'ND'
-    
-    # Remove entries where the well ID is blank (associated with lab QC results)
-    df = df[df[well_col].notna() & (df[well_col].astype(str).str.strip() != "")]
-
-    # Remove rows where Result is missing/blank
-    clean_df = df[df[result_col].notna() & (df[result_col].str.strip() != "")]
-
-    results = []
-    nd_constituents = []
-
-    for constituent, group in clean_df.groupby(analyte_col):
-        group = group.copy()
-
-        # Skip if the group has no valid rows
-        if group.empty:
-            continue
-
-        # Check if all are ND
-        if group['ND Flag'].all():
-            nd_constituents.append(constituent)
-            results.append({
-                "Constituent": constituent,
-                "Max Value": "",
-                "Well ID of Max": "",
-                "Date of Max": "",
-                "Min Value": "",
-                "Well ID of Min": "",
-                "Date of Min": "",
-                "100% NDs": "Yes"
-            })
-            continue
-
-        # Convert values to numeric if not ND
-        def try_float(val):
-            try:
-                return float(val)
-            except:
-                return None
-
-        group["Result Value"] = group[~group['ND Flag']][result_col].apply(try_float)
-
-        numeric_group = group.dropna(subset=["Result Value"])
-        if numeric_group.empty:
-            continue
-
-        max_row = numeric_group.loc[numeric_group["Result Value"].idxmax()]
-        min_row = numeric_group.loc[numeric_group["Result Value"].idxmin()]
-
-        results.append({
-            "Constituent": constituent,
-            "Max Value": max_row[result_col],
-            "Well ID of Max": max_row[well_col],
-            "Date of Max": max_row[date_col],
-            "Min Value": min_row[result_col],
-            "Well ID of Min": min_row[well_col],
-            "Date of Min": min_row[date_col],
-            "100% NDs": ""
-        })
-
-    result_df = pd.DataFrame(results)
-    return result_df, nd_constituents
\ No newline at end of file
+    unmatched = []
+    if analyte_index is not None:
+        df[analyte_col], unmatched = analyte_index.map_names(df[analyte_col])
+
+    # String parsing runs once per unique result / well, then is broadcast
+    # back through the factorized codes.
+    r_code, r_uniques = pd.factorize(df[result_col])
+    r_text = pd.Series(r_uniques, dtype=object).astype(str).str.strip()
+    r_nd = (r_text.str.upper().eq("ND") | r_text.str.startswith("<")).to_numpy()
+    r_value = pd.to_numeric(r_text, errors="coerce").to_numpy()
+
+    w_code, w_uniques = pd.factorize(df[well_col])
+    w_blank = pd.Series(w_uniques, dtype=object).astype(str).str.strip().eq("").to_numpy()
+
+    # Drop lab QC rows (blank well ID) and blank results
+    keep = (w_code >= 0) & (r_code >= 0)
+    keep[keep] = ~w_blank[w_code[keep]] & r_text.ne("").to_numpy()[r_code[keep]]
+    df, r_code = df[keep], r_code[keep]
+
+    result = pd.Series(r_text.to_numpy()[r_code], index=df.index)
+    value = pd.Series(r_value[r_code], index=df.index)
+    is_nd = r_nd[r_code]
+    is_det = ~is_nd & ~np.isnan(r_value[r_code])
+
+    # Integer codes for analyte and (well, analyte) pairs
+    a_code, analytes = pd.factorize(df[analyte_col], sort=True)
+    w_code, wells = pd.factorize(df[well_col], sort=True)
+    pair_code = a_code.astype(np.int64) * len(wells) + w_code
+
+    # ------------------------------------------------------------
+    # Detection frequency per constituent
+    # ------------------------------------------------------------
+    samples = np.bincount(a_code, minlength=len(analytes))
+    detections = np.bincount(a_code[is_det], minlength=len(analytes))
+    # Counted from the ND flags: unparseable text is neither a detection nor an ND
+    non_detects = np.bincount(a_code[is_nd], minlength=len(analytes))
+    frequency = pd.DataFrame({
+        "Constituent": analytes,
+        "Samples": samples,
+        "Detections": detections,
+        "Non-Detects": non_detects,
+        "Detection Frequency (%)": np.round(100.0 * detections / np.maximum(samples, 1), 1),
+    })
+
+    # ------------------------------------------------------------
+    # One sort: constituent ascending, value descending
+    # ------------------------------------------------------------
+    det_idx = np.flatnonzero(is_det)
+    det_value = value.to_numpy()[det_idx]
+    order = det_idx[np.lexsort((-det_value, a_code[det_idx]))]
+
+    ranked = pd.DataFrame({
+        "Constituent": analytes.take(a_code[order]),
+        "Well ID": df[well_col].to_numpy()[order],
+        "Date": df[date_col].to_numpy()[order],
+        "Value": result.to_numpy()[order],
+        "_numeric": value.to_numpy()[order],
+        "_a": a_code[order],
+        "_pair": pair_code[order],
+    })
+
+    top = ranked.groupby("_a", sort=False).head(top_n).copy()
+    top.insert(1, "Rank", top.groupby("_a", sort=False).cumcount() + 1)
+
+    # First row of each (well, constituent) pair in the sorted order is its max
+    well_max = ranked.drop_duplicates("_pair").copy()
+    pair_samples = np.bincount(pair_code, minlength=len(analytes) * len(wells))
+    pair_dets = np.bincount(pair_code[is_det], minlength=len(analytes) * len(wells))
+    well_max["Samples"] = pair_samples[well_max["_pair"].to_numpy()]
+    well_max["Detections"] = pair_dets[well_max["_pair"].to_numpy()]
+    well_max = well_max.sort_values(["_a", "Well ID"], kind="stable").rename(
+        columns={"Value": "Max Value", "Date": "Date of Max"}
+    )
+
+    # ------------------------------------------------------------
+    # Max / min per constituent: the first row of each constituent in the
+    # sorted order, and the first of its rows holding the smallest value
+    # (ties keep the original row order, the sort being stable)
+    # ------------------------------------------------------------
+    a_all = np.arange(len(analytes))
+    max_rows = ranked.drop_duplicates("_a").set_index("_a").reindex(a_all)
+    smallest = ranked["_numeric"].eq(ranked.groupby("_a", sort=False)["_numeric"].transform("min"))
+    min_rows = ranked[smallest].drop_duplicates("_a").set_index("_a").reindex(a_all)
+    all_nd = non_detects == samples
+
+    summary = pd.DataFrame({
+        "Constituent": analytes,
+        "Max Value": max_rows["Value"].to_numpy(),
+        "Well ID of Max": max_rows["Well ID"].to_numpy(),
+        "Date of Max": max_rows["Date"].to_numpy(),
+        "Min Value": min_rows["Value"].to_numpy(),
+        "Well ID of Min": min_rows["Well ID"].to_numpy(),
+        "Date of Min": min_rows["Date"].to_numpy(),
+        "100% NDs": np.where(all_nd, "Yes", ""),
+    })
+    # Constituents with neither a detection nor all NDs (text only) are left out
+    summary = summary[(detections > 0) | all_nd].fillna("").reset_index(drop=True)
+    summary.attrs["unmatched_analytes"] = unmatched
+
+    helper_cols = ["_numeric", "_a", "_pair"]
+    return {
+        "summary": summary,
+        "top_n": top.drop(columns=helper_cols).reset_index(drop=True),
+        "well_max": well_max.drop(columns=helper_cols).reset_index(drop=True),
+        "frequency": frequency,
+    }
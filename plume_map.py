@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core import build_gwps_lookup, load_wells
+from format_dataset import long_data_source
+from ingest import UPLOAD_TYPES
+from spatial import IDWInterpolator, colorize, make_grid, mark_points
+from timeseries_chart import prepare_series
+
+EVENT_MAX = "Maximum (all events)"
+EVENT_LATEST = "Latest result"
+ND_FACTORS = {"½ × reporting limit": 0.5, "Reporting limit": 1.0, "Zero": 0.0}
+
+
+@st.cache_resource(max_entries=8)
+def _interpolator(xy, nx, ny, k, power):
+    grid_x, grid_y = make_grid(xy, nx=nx, ny=ny)
+    return IDWInterpolator(xy, grid_x, grid_y, k=k, power=power)
+
+
+@st.cache_data(max_entries=512)
+def _plume_grid(xy, values, nx, ny, k, power):
+    # Keyed on the per-well values, so each (analyte, event, metric) grid is
+    # computed once and switching back to it is a cache hit.
+    return _interpolator(xy, nx, ny, k, power).interpolate(values)
+
+
+def well_values(data, positions, wells, analyte, event, nd_factor):
+    """
+    One value per well (aligned with ``wells``) for an analyte and event.
+    """
+    rows = [positions[(w, analyte)] for w in wells if (w, analyte) in positions]
+    if not rows:
+        return np.full(len(wells), np.nan)
+    sub = data.iloc[np.concatenate(rows)]
+    value = sub["Value"].where(~sub["ND"], sub["Value"] * nd_factor)
+
+    if event == EVENT_MAX:
+        per_well = value.groupby(sub["Well ID"]).max()
+    elif event == EVENT_LATEST:
+        # Series are sorted by date, so the last row per well is the latest
+        per_well = value.groupby(sub["Well ID"]).last()
+    else:
+        on_day = (sub["Date"].dt.normalize() == pd.Timestamp(event)).to_numpy()
+        per_well = value[on_day].groupby(sub["Well ID"][on_day]).max()
+
+    return per_well.reindex(wells).to_numpy(dtype=float)
+
+
+def plume_map_app():
+    st.title("🗺️ Plume Maps")
+
+    st.markdown("""
+    Interpolates each constituent onto a grid from well locations (inverse-distance
+    weighting over the nearest wells). Upload a wells list with **X/Y**
+    (or Easting/Northing, Longitude/Latitude) columns next to the well IDs.
+    """)
+
+    long_df, token = long_data_source("plume")
+    if long_df is None:
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        wells_file = st.file_uploader("Wells list with X/Y coordinates", type=UPLOAD_TYPES, key="plume_wells")
+    with col2:
+        gwps_file = st.file_uploader("GWPS table (optional, enables exceedance ratio)", type=UPLOAD_TYPES, key="plume_gwps")
+
+    if not wells_file:
+        st.info("Upload a wells list with coordinates to draw maps.")
+        return
+
+    wells_df = load_wells(wells_file)
+    if not {"X", "Y"}.issubset(wells_df.columns):
+        st.error("No X/Y coordinate columns found in the wells list.")
+        return
+    wells_df = wells_df.dropna(subset=["X", "Y"])
+    if len(wells_df) < 3:
+        st.error("At least three wells with coordinates are needed.")
+        return
+
+    if st.session_state.get("plume_token") != token:
+        st.session_state.plume_series = prepare_series(long_df)
+        st.session_state.plume_token = token
+    data, positions = st.session_state.plume_series
+
+    wells = wells_df["Well"].tolist()
+    xy = wells_df[["X", "Y"]].to_numpy(dtype=float)
+
+    # --------------------------------------------------------------
+    # Selection
+    # --------------------------------------------------------------
+    analytes = sorted({a for (w, a) in positions if w in set(wells)})
+    if not analytes:
+        st.warning("None of the mapped wells have numeric results.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        analyte = st.selectbox("Constituent", analytes)
+    with col2:
+        days = sorted(data["Date"].dt.normalize().unique(), reverse=True)
+        event = st.selectbox(
+            "Event",
+            [EVENT_MAX, EVENT_LATEST] + [pd.Timestamp(d).strftime("%Y-%m-%d") for d in days],
+        )
+    with col3:
+        nd_rule = st.selectbox("Non-detects as", list(ND_FACTORS))
+
+    gwps_lookup, index = build_gwps_lookup(gwps_file) if gwps_file is not None else (None, None)
+    metrics = ["Concentration"] + (["Exceedance ratio (result / GWPS)"] if gwps_file is not None else [])
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        metric = st.radio("Map", metrics)
+    with col2:
+        resolution = st.select_slider("Grid size", [100, 200, 300, 500], value=300)
+    with col3:
+        k = st.number_input("Neighbour wells", min_value=3, max_value=32, value=8)
+    with col4:
+        power = st.number_input("IDW power", min_value=1.0, max_value=5.0, value=2.0, step=0.5)
+
+    # --------------------------------------------------------------
+    # Grid
+    # --------------------------------------------------------------
+    values = well_values(data, positions, wells, analyte, event, ND_FACTORS[nd_rule])
+    contour = None
+    if metric.startswith("Exceedance"):
+        gwps_val = gwps_lookup.get(index.canonical(analyte, analyte), np.nan)
+        if pd.isna(gwps_val) or gwps_val == 0:
+            st.warning(f"No GWPS found for {analyte}; showing concentration instead.")
+        else:
+            values = values / gwps_val
+            contour = 1.0
+
+    if np.isnan(values).all():
+        st.warning("No results for this constituent and event at the mapped wells.")
+        return
+
+    grid = _plume_grid(xy, values, int(resolution), int(resolution), int(k), float(power))
+    rgb = mark_points(colorize(grid, contour=contour), xy, *make_grid(xy, int(resolution), int(resolution)))
+
+    st.image(rgb, use_container_width=True)
+    legend = f"Colour scale {np.nanmin(grid):.4g} (purple) → {np.nanmax(grid):.4g} (yellow); black squares are wells."
+    if contour is not None:
+        legend += " Red outline marks the GWPS (ratio = 1)."
+    st.caption(legend)
+
+    st.dataframe(
+        pd.DataFrame({"Well": wells, "X": xy[:, 0], "Y": xy[:, 1], metric: values}),
+        use_container_width=True,
+        hide_index=True,
+    )
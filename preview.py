@@ -0,0 +1,155 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from analyte_index import get_analyte_index
+
+PAGE_SIZES = [50, 100, 250, 500, 1000]
+
+
+def session_memo(name, token, build):
+    """
+    Return ``build()`` cached in session state until ``token`` changes.
+
+    Paging and sorting rerun the whole script; this keeps the expensive
+    steps behind a preview (parsing, reshaping, export files) from running
+    again when only the visible window moved.
+    """
+    slot = st.session_state.get(name)
+    if slot is None or slot[0] != token:
+        slot = (token, build())
+        st.session_state[name] = slot
+    return slot[1]
+
+
+def alias_overrides_uploader():
+    """
+    Sidebar upload of a site alias table (Canonical, Alias) that extends the
+    analyte aliases on every page for the rest of the session.
+    """
+    uploaded = st.sidebar.file_uploader(
+        "Analyte alias overrides (Canonical, Alias)",
+        type=["csv", "xlsx", "xls"],
+        key="analyte_overrides_upload",
+        help="Maps lab spellings or CAS numbers onto the names used in your GWPS table",
+    )
+    st.session_state.analyte_overrides = uploaded.getvalue() if uploaded else None
+
+
+def session_analyte_index():
+    """
+    The analyte index for this session, with any uploaded alias overrides.
+
+    Returns ``(index, token)``; the token changes with the overrides so it
+    can be part of a ``session_memo`` token.
+    """
+    overrides = st.session_state.get("analyte_overrides")
+    token = hashlib.sha1(overrides).hexdigest() if overrides else None
+    return get_analyte_index(overrides), token
+
+
+def _fingerprint(df):
+    # Cheap identity for a frame: shape, columns and a sample of rows.
+    # Avoids hashing a million-row frame on every rerun.
+    sample = df.iloc[np.linspace(0, len(df) - 1, min(len(df), 200)).astype(int)] if len(df) else df
+    return (df.shape, tuple(map(str, df.columns)), int(pd.util.hash_pandas_object(sample, index=True).sum()))
+
+
+def _memory_mb(df):
+    # Deep usage measured on a sample and scaled, so object columns are
+    # accounted for without walking every string.
+    if df.empty:
+        return 0.0
+    sample = df.sample(min(len(df), 1000), random_state=0)
+    return sample.memory_usage(deep=True, index=True).sum() * len(df) / len(sample) / 1e6
+
+
+def _pager(n_rows, key):
+    col1, col2, _ = st.columns([1, 1, 2])
+    with col1:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+    n_pages = max(1, -(-n_rows // page_size))
+    # Back to the first page when a new filter or page size leaves fewer pages
+    if st.session_state.get(f"{key}_page", 1) > n_pages:
+        st.session_state[f"{key}_page"] = 1
+    with col2:
+        page = st.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, key=f"{key}_page")
+    start = (int(page) - 1) * page_size
+    return start, min(start + page_size, n_rows)
+
+
+def paged_dataframe(df, key, title=None):
+    """
+    Show a large DataFrame a page at a time.
+
+    Sorting and filtering run on the server-side frame; only the visible
+    window is sent to the browser. The sort/filter order is cached in session
+    state so paging through it does not repeat the work.
+    """
+    if title:
+        st.markdown(title)
+
+    # A named index (e.g. Analyte in the GWPS summary) becomes ordinary
+    # columns so it can be sorted and filtered like the rest
+    named_index = any(name is not None for name in df.index.names)
+    if named_index:
+        df = df.reset_index()
+
+    n_rows, n_cols = df.shape
+    st.caption(f"{n_rows:,} rows × {n_cols:,} columns · ~{_memory_mb(df):,.1f} MB in memory")
+
+    columns = [str(c) for c in df.columns]
+    with st.expander("Sort / filter", expanded=False):
+        col1, col2, col3, col4 = st.columns([2, 1, 2, 2])
+        with col1:
+            sort_col = st.selectbox("Sort by", ["(none)"] + columns, key=f"{key}_sort")
+        with col2:
+            ascending = st.radio("Order", ["Asc", "Desc"], key=f"{key}_order", horizontal=True) == "Asc"
+        with col3:
+            filter_col = st.selectbox("Filter column", ["(none)"] + columns, key=f"{key}_filter_col")
+        with col4:
+            filter_text = st.text_input("Contains", key=f"{key}_filter_text")
+
+    state_key = (_fingerprint(df), sort_col, ascending, filter_col, filter_text)
+    cache = st.session_state.get(f"{key}_positions")
+    if cache is None or cache[0] != state_key:
+        positions = np.arange(n_rows)
+        if filter_col != "(none)" and filter_text:
+            values = df.iloc[:, columns.index(filter_col)]
+            mask = values.astype(str).str.contains(filter_text, case=False, regex=False, na=False)
+            positions = positions[mask.to_numpy()]
+        if sort_col != "(none)":
+            values = df.iloc[positions, columns.index(sort_col)]
+            numeric = pd.to_numeric(values, errors="coerce")
+            # Numeric-looking columns sort by value, everything else as text
+            keys = numeric if numeric.notna().sum() >= values.notna().sum() * 0.9 else values.astype(str)
+            order = keys.reset_index(drop=True).sort_values(ascending=ascending, kind="stable", na_position="last").index
+            positions = positions[order.to_numpy()]
+        cache = (state_key, positions)
+        st.session_state[f"{key}_positions"] = cache
+    positions = cache[1]
+
+    if len(positions) != n_rows:
+        st.caption(f"{len(positions):,} rows match the filter.")
+
+    start, stop = _pager(len(positions), key)
+    st.dataframe(df.iloc[positions[start:stop]], use_container_width=True, hide_index=named_index or None)
+
+
+def paged_matrix(matrix, key, title=None):
+    """
+    Page through a ``matrix_builder.SparseMatrix``, densifying only the
+    visible rows.
+    """
+    if title:
+        st.markdown(title)
+
+    n_rows, n_cols = matrix.shape
+    st.caption(
+        f"{n_rows:,} rows × {n_cols:,} constituents · {matrix.nnz:,} filled cells "
+        f"({matrix.density:.1%} dense)"
+    )
+    start, stop = _pager(n_rows, key)
+    st.dataframe(matrix.block(start, stop), use_container_width=True, hide_index=True)
@@ -0,0 +1,251 @@
+"""
+Per-well and per-analyte report bundle.
+
+The lab data are prepared once (``core.prepare_lab_data``) and partitioned
+once by well and by analyte from group indices. Each partition is rendered
+to its own workbook (or set of CSVs) with the full history, the GWPS
+exceedances and summary statistics. Partitions are rendered in a process
+pool and streamed into a single ZIP in order as they finish, with a
+``manifest.csv`` listing every file.
+"""
+import hashlib
+import io
+import os
+import re
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from core import prepare_lab_data
+
+BUNDLE_FORMATS = ("xlsx", "csv")
+PARTITIONS = {"well": "Well", "analyte": "Analyte"}
+
+# Lab columns carried into the history tables when present
+HISTORY_COLUMNS = [
+    "Client Sample ID", "Analyte", "Collection Date", "Formatted", "Unit",
+    "Flag", "High Limit", "Is_ND", "Effective",
+]
+
+
+def _safe_name(name):
+    return re.sub(r"[^\w.-]+", "_", str(name)).strip("_") or "blank"
+
+
+def _unique_stems(names):
+    """
+    File stems for partition names, unique within one archive folder.
+
+    Names that sanitize to the same stem (ignoring case, for
+    case-insensitive file systems), such as "MW-1(A)" and "MW-1 A", get a
+    short hash of the original name appended.
+    """
+    safe = {name: _safe_name(name) for name in names}
+    counts = Counter(stem.lower() for stem in safe.values())
+    return {
+        name: stem if counts[stem.lower()] == 1
+        else f"{stem}_{hashlib.sha1(str(name).encode('utf-8')).hexdigest()[:8]}"
+        for name, stem in safe.items()
+    }
+
+
+def _date_column(lab_df):
+    dates = [c for c in lab_df.columns if "date" in c.lower()]
+    preferred = [c for c in dates if "collect" in c.lower() or "sample" in c.lower()]
+    return (preferred or dates or [None])[0]
+
+
+def history_table(lab_df, gwps_lookup):
+    """
+    Lab records in report layout with the GWPS and an exceedance flag.
+
+    Exceedance uses the same comparison as the summary table: the effective
+    value (result, or reporting limit for a non-detect) above the GWPS.
+    """
+    date_col = _date_column(lab_df)
+    cols = [c for c in HISTORY_COLUMNS if c in lab_df.columns]
+    if date_col and date_col not in cols:
+        cols.insert(2, date_col)
+
+    hist = lab_df[cols].rename(columns={
+        "Client Sample ID": "Well",
+        "Formatted": "Result",
+        "Is_ND": "ND",
+        date_col: "Date",
+    })
+    if "Date" in hist.columns:
+        hist["Date"] = pd.to_datetime(hist["Date"], errors="coerce")
+    hist["GWPS"] = hist["Analyte"].map(gwps_lookup)
+    hist["Exceeds GWPS"] = hist["Effective"].to_numpy() > hist["GWPS"].to_numpy()
+    return hist.reset_index(drop=True)
+
+
+def partition_positions(hist, by):
+    """
+    Row positions per group (one pass over the key column).
+    """
+    return hist.groupby(by, sort=True).indices
+
+
+def _statistics(part, by):
+    # Per-analyte stats for a well report, per-well stats for an analyte report
+    detected = part["Effective"].where(~part["ND"].astype(bool))
+    grouped = detected.groupby(part[by], sort=True)
+    stats = pd.DataFrame({
+        "Samples": part.groupby(by, sort=True).size(),
+        "Detects": grouped.count(),
+        "Min Detect": grouped.min(),
+        "Max Detect": grouped.max(),
+        "Mean Detect": grouped.mean(),
+        "GWPS": part.groupby(by, sort=True)["GWPS"].first(),
+        "Exceedances": part.groupby(by, sort=True)["Exceeds GWPS"].sum(),
+    })
+    stats.insert(2, "Detection Frequency", (stats["Detects"] / stats["Samples"]).round(3))
+    if "Date" in part.columns:
+        stats["First Date"] = part.groupby(by, sort=True)["Date"].min()
+        stats["Last Date"] = part.groupby(by, sort=True)["Date"].max()
+    return stats.reset_index()
+
+
+def render_partition(task):
+    """
+    Render one partition's report (runs in a worker process).
+
+    Returns a list of ``(arcname, bytes)`` files and a manifest row.
+    """
+    kind, name, stem, part, fmt = task
+    other = "Analyte" if kind == "well" else "Well"
+    sort_cols = [c for c in (other, "Date") if c in part.columns]
+    part = part.sort_values(sort_cols, kind="stable")
+    exceed = part[part["Exceeds GWPS"]]
+    stats = _statistics(part, other)
+    sheets = {"History": part, "Exceedances": exceed, "Statistics": stats}
+
+    stem = f"{kind}s/{stem}"
+    if fmt == "xlsx":
+        buffer = io.BytesIO()
+        with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+            for sheet, table in sheets.items():
+                table.to_excel(writer, sheet_name=sheet, index=False)
+        files = [(f"{stem}.xlsx", buffer.getvalue())]
+    else:
+        files = [
+            (f"{stem}/{sheet.lower()}.csv", table.to_csv(index=False).encode("utf-8"))
+            for sheet, table in sheets.items()
+        ]
+
+    row = {
+        "Type": kind,
+        "Name": name,
+        "Records": len(part),
+        "Detects": int((~part["ND"].astype(bool)).sum()),
+        "Exceedances": len(exceed),
+    }
+    return files, row
+
+
+def _tasks(hist, by, fmt):
+    for kind in by:
+        positions = partition_positions(hist, PARTITIONS[kind])
+        stems = _unique_stems(positions)
+        for name, idx in positions.items():
+            yield kind, name, stems[name], hist.take(idx), fmt
+
+
+def write_report_bundle(hist, output, by=("well", "analyte"), fmt="xlsx", max_workers=None):
+    """
+    Render every partition in a process pool and stream it into a ZIP.
+
+    At most ``2 * max_workers`` partitions are in flight at once, so memory
+    stays bounded however many wells and analytes there are. Files are
+    written in partition order. Returns the manifest DataFrame (also stored
+    in the archive as ``manifest.csv``).
+    """
+    if fmt not in BUNDLE_FORMATS:
+        raise ValueError(f"Unknown bundle format {fmt!r}; expected one of {BUNDLE_FORMATS}")
+    max_workers = max_workers or min(os.cpu_count() or 1, 8)
+
+    # XLSX files are already deflated; only CSVs benefit from compression
+    compression = zipfile.ZIP_STORED if fmt == "xlsx" else zipfile.ZIP_DEFLATED
+    manifest = []
+
+    with zipfile.ZipFile(output, "w", compression=compression) as zf, \
+            ProcessPoolExecutor(max_workers=max_workers) as pool:
+        tasks = _tasks(hist, by, fmt)
+        pending = []
+
+        def drain(limit):
+            while len(pending) > limit:
+                files, row = pending.pop(0).result()
+                for arcname, data in files:
+                    zf.writestr(arcname, data)
+                    manifest.append({**row, "File": arcname, "Bytes": len(data)})
+
+        for task in tasks:
+            pending.append(pool.submit(render_partition, task))
+            drain(2 * max_workers)
+        drain(0)
+
+        manifest = pd.DataFrame(
+            manifest,
+            columns=["File", "Type", "Name", "Records", "Detects", "Exceedances", "Bytes"],
+        )
+        zf.writestr("manifest.csv", manifest.to_csv(index=False))
+
+    return manifest
+
+
+def generate_report_bundle(
+    lab_source,
+    gwps_source,
+    output,
+    wells=None,
+    wells_source=None,
+    sheet_name=None,
+    analyte_index=None,
+    by=("well", "analyte"),
+    fmt="xlsx",
+    max_workers=None,
+):
+    """
+    Generate the per-well / per-analyte report bundle.
+
+    Parameters
+    ----------
+    lab_source, gwps_source, wells, wells_source, sheet_name, analyte_index
+        As for ``core.generate_gw_summary``
+    output : path or file-like
+        Destination of the ZIP archive
+    by : tuple of {"well", "analyte"}
+        Which partitions to report on
+    fmt : {"xlsx", "csv"}
+        One workbook per partition (History / Exceedances / Statistics
+        sheets) or one folder of three CSVs per partition
+    max_workers : int or None
+        Worker processes; defaults to the CPU count (at most 8)
+
+    Returns
+    -------
+    pd.DataFrame
+        The manifest (file, partition, record/detect/exceedance counts,
+        size in bytes).
+    """
+    unknown = set(by) - set(PARTITIONS)
+    if unknown:
+        raise ValueError(f"Unknown partition(s) {sorted(unknown)}; expected {list(PARTITIONS)}")
+
+    lab_df, wells, gwps_lookup, unmatched = prepare_lab_data(
+        lab_source,
+        gwps_source,
+        wells=wells,
+        wells_source=wells_source,
+        sheet_name=sheet_name,
+        analyte_index=analyte_index,
+    )
+    hist = history_table(lab_df, gwps_lookup)
+
+    manifest = write_report_bundle(hist, output, by=by, fmt=fmt, max_workers=max_workers)
+    manifest.attrs["unmatched_analytes"] = unmatched
+    return manifest
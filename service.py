@@ -0,0 +1,412 @@
+# service.py
+"""
+Local HTTP service for the summary engines, runnable without Streamlit.
+
+    python service.py --port 8765 --workers 4 --queue-size 32 --aliases site_aliases.csv
+
+Endpoints
+---------
+POST /summary        generate_gw_summary
+POST /max-detection  rank_detections (max/min summary and ranking views)
+GET  /metrics        throughput / latency / queue counters
+GET  /health         liveness check
+
+Request bodies are JSON. Files are sent base64-encoded (XLSX, XLS, CSV or
+Parquet, detected from their contents):
+
+    /summary        {"lab": "<b64>", "gwps": "<b64>", "wells": "<b64>" | null,
+                     "wells_list": ["MW-1", ...] | null, "sheet_name": null,
+                     "aliases": "<b64>" | null, "format": "json" | "csv" | "xlsx"}
+    /max-detection  {"lab": "<b64>", "well_col": "...", "analyte_col": "...",
+                     "result_col": "...", "date_col": "...", "top_n": 5,
+                     "normalize": true, "aliases": "<b64>" | null,
+                     "format": "json"}
+
+"aliases" is an analyte alias table (Canonical, Alias) applied on top of the
+bundled aliases and the service-wide ``--aliases`` table.
+
+Jobs run in a bounded process pool. Requests wait in a bounded queue; when
+it is full the service answers 503 with Retry-After instead of piling up
+work. Identical requests (same endpoint and body hash) share one job, and
+recent results are kept in a small LRU cache.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+
+import pandas as pd
+
+from analyte_index import OVERRIDES_ENV
+
+MAX_BODY_BYTES = 256 * 1024 * 1024
+CONTENT_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ------------------------------------------------------------
+# Jobs (run inside worker processes)
+# ------------------------------------------------------------
+def _decode_file(payload, key, required=True):
+    data = payload.get(key)
+    if data is None:
+        if required:
+            raise ValueError(f"Missing required file field: {key}")
+        return None
+    return io.BytesIO(base64.b64decode(data))
+
+
+def _analyte_index(payload):
+    from analyte_index import get_analyte_index
+
+    aliases = payload.get("aliases")
+    return get_analyte_index(base64.b64decode(aliases) if aliases else None)
+
+
+def _render(tables, fmt, extra=None):
+    """
+    Serialize named DataFrames; CSV output uses the first table only.
+    """
+    if fmt == "csv":
+        return next(iter(tables.values())).to_csv(index=False).encode("utf-8")
+
+    if fmt == "xlsx":
+        output = io.BytesIO()
+        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+            for name, df in tables.items():
+                df.to_excel(writer, index=False, sheet_name=name[:31])
+        return output.getvalue()
+
+    body = {name: json.loads(df.to_json(orient="records")) for name, df in tables.items()}
+    body.update(extra or {})
+    return json.dumps(body).encode("utf-8")
+
+
+def run_summary_job(payload):
+    from core import generate_gw_summary
+
+    summary = generate_gw_summary(
+        lab_source=_decode_file(payload, "lab"),
+        gwps_source=_decode_file(payload, "gwps"),
+        output_path=None,
+        wells=payload.get("wells_list"),
+        wells_source=_decode_file(payload, "wells", required=False),
+        sheet_name=payload.get("sheet_name"),
+        analyte_index=_analyte_index(payload),
+    )
+    unmatched = summary.attrs.get("unmatched_analytes", [])
+    if payload["format"] == "xlsx":
+        from summary_workbook import write_summary_workbook
+
+        return write_summary_workbook(summary, io.BytesIO()).getvalue()
+
+    table = summary.reset_index()
+    table.columns = [str(c) for c in table.columns]
+    return _render({"Summary": table}, payload["format"], {"unmatched_analytes": unmatched})
+
+
+def run_max_detection_job(payload):
+    from core import load_data
+    from max_min_analysis import nd_constituents, rank_detections
+
+    # Same analysis as the Max Detection page: analyte names normalized
+    # unless "normalize" is false, summary plus the three ranking views
+    df = load_data(_decode_file(payload, "lab"))
+    views = rank_detections(
+        df,
+        well_col=payload["well_col"],
+        analyte_col=payload["analyte_col"],
+        result_col=payload["result_col"],
+        date_col=payload["date_col"],
+        top_n=int(payload.get("top_n") or 5),
+        analyte_index=_analyte_index(payload) if payload.get("normalize", True) else None,
+    )
+    summary_df = views.pop("summary")
+    tables = {
+        "Summary": summary_df,
+        "Top N": views["top_n"],
+        "Max per Well": views["well_max"],
+        "Detection Frequency": views["frequency"],
+    }
+    extra = {
+        "nd_only": nd_constituents(summary_df),
+        "unmatched_analytes": summary_df.attrs.get("unmatched_analytes", []),
+    }
+    return _render(tables, payload["format"], extra)
+
+
+ENDPOINTS = {
+    "/summary": (run_summary_job, ("lab", "gwps")),
+    "/max-detection": (run_max_detection_job, ("lab", "well_col", "analyte_col", "result_col", "date_col")),
+}
+# Paths counted individually in /metrics; anything else is counted as "other"
+KNOWN_PATHS = ("/health", "/metrics", *ENDPOINTS)
+
+
+# ------------------------------------------------------------
+# Metrics
+# ------------------------------------------------------------
+class Metrics:
+    def __init__(self, window=1000):
+        self.started = time.monotonic()
+        self.requests = {}
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.dedup_hits = 0
+        self.cache_hits = 0
+        self.latencies = deque(maxlen=window)
+        self.finished_at = deque(maxlen=window)
+
+    def count_request(self, path):
+        # Bounded key set: arbitrary (e.g. 404) paths share one bucket
+        key = path if path in KNOWN_PATHS else "other"
+        self.requests[key] = self.requests.get(key, 0) + 1
+
+    def record(self, seconds, ok=True):
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+        self.latencies.append(seconds)
+        self.finished_at.append(time.monotonic())
+
+    def snapshot(self, queue_depth, in_flight, workers, queue_size):
+        now = time.monotonic()
+        uptime = now - self.started
+        lat = sorted(self.latencies)
+
+        def pct(p):
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))], 4) if lat else None
+
+        last_minute = sum(1 for t in self.finished_at if now - t <= 60)
+        return {
+            "uptime_s": round(uptime, 1),
+            "workers": workers,
+            "queue_size": queue_size,
+            "queue_depth": queue_depth,
+            "in_flight": in_flight,
+            "requests": self.requests,
+            "jobs_completed": self.completed,
+            "jobs_failed": self.failed,
+            "rejected_queue_full": self.rejected,
+            "dedup_hits": self.dedup_hits,
+            "cache_hits": self.cache_hits,
+            "throughput_jobs_per_s": round(self.completed / uptime, 4) if uptime else 0.0,
+            "throughput_last_60s": last_minute,
+            "latency_s": {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99), "max": lat[-1] if lat else None},
+        }
+
+
+# ------------------------------------------------------------
+# Service
+# ------------------------------------------------------------
+class SummaryService:
+    def __init__(self, workers=2, queue_size=16, cache_size=32):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.cache_size = cache_size
+        self.metrics = Metrics()
+        self.pool = None
+        self.queue = None
+        self.in_flight = {}
+        self.cache = OrderedDict()
+
+    async def start(self):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        # One dispatcher per worker keeps at most `workers` jobs in the pool;
+        # everything else waits in the bounded queue.
+        self.dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.dispatchers:
+            task.cancel()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job, payload, future, queued_at = await self.queue.get()
+            try:
+                body = await loop.run_in_executor(self.pool, job, payload)
+            except Exception as e:
+                self.metrics.record(time.monotonic() - queued_at, ok=False)
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self.metrics.record(time.monotonic() - queued_at)
+                if not future.done():
+                    future.set_result(body)
+            finally:
+                self.queue.task_done()
+
+    async def submit(self, path, payload, key):
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.metrics.cache_hits += 1
+            return self.cache[key]
+
+        if key in self.in_flight:
+            self.metrics.dedup_hits += 1
+            return await asyncio.shield(self.in_flight[key])
+
+        job, _ = ENDPOINTS[path]
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((job, payload, future, time.monotonic()))
+        except asyncio.QueueFull:
+            self.metrics.rejected += 1
+            raise RequestError(HTTPStatus.SERVICE_UNAVAILABLE, "Job queue is full, retry later")
+
+        self.in_flight[key] = future
+        try:
+            body = await asyncio.shield(future)
+        finally:
+            self.in_flight.pop(key, None)
+
+        self.cache[key] = body
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return body
+
+    # --------------------------------------------------------
+    # HTTP layer
+    # --------------------------------------------------------
+    async def handle(self, reader, writer):
+        status, body, content_type, headers = HTTPStatus.OK, b"", "application/json", {}
+        try:
+            method, path, query, raw = await self._read_request(reader)
+            self.metrics.count_request(path)
+
+            if method == "GET" and path == "/health":
+                body = b'{"status": "ok"}'
+            elif method == "GET" and path == "/metrics":
+                snapshot = self.metrics.snapshot(
+                    self.queue.qsize(), len(self.in_flight), self.workers, self.queue_size
+                )
+                body = json.dumps(snapshot).encode("utf-8")
+            elif path in ENDPOINTS:
+                if method != "POST":
+                    raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST")
+                payload = self._parse_payload(path, query, raw)
+                key = hashlib.sha256(path.encode() + b"\0" + json.dumps(payload, sort_keys=True).encode()).hexdigest()
+                body = await self.submit(path, payload, key)
+                content_type = CONTENT_TYPES[payload["format"]]
+                headers["X-Input-Hash"] = key
+            else:
+                raise RequestError(HTTPStatus.NOT_FOUND, f"Unknown endpoint {path}")
+
+        except RequestError as e:
+            status, body = e.status, json.dumps({"error": str(e)}).encode("utf-8")
+            if status == HTTPStatus.SERVICE_UNAVAILABLE:
+                headers["Retry-After"] = "5"
+        except (KeyError, ValueError) as e:
+            status, body = HTTPStatus.UNPROCESSABLE_ENTITY, json.dumps({"error": str(e)}).encode("utf-8")
+        except Exception as e:
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, json.dumps({"error": str(e)}).encode("utf-8")
+
+        head = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        head += [f"Content-Type: {content_type}", f"Content-Length: {len(body)}", "Connection: close"]
+        head += [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        try:
+            header_block = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Malformed request")
+
+        lines = header_block.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0) or 0)
+        if length > MAX_BODY_BYTES:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        raw = await reader.readexactly(length) if length else b""
+
+        url = urlsplit(target)
+        return method.upper(), url.path.rstrip("/") or "/", parse_qs(url.query), raw
+
+    def _parse_payload(self, path, query, raw):
+        try:
+            payload = json.loads(raw or b"{}")
+        except json.JSONDecodeError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Body is not valid JSON: {e}")
+        if not isinstance(payload, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+
+        _, required = ENDPOINTS[path]
+        missing = [field for field in required if not payload.get(field)]
+        if missing:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Missing fields: {', '.join(missing)}")
+
+        fmt = (query.get("format") or [payload.get("format") or "json"])[0].lower()
+        if fmt not in CONTENT_TYPES:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Unknown format '{fmt}'")
+        payload["format"] = fmt
+        return payload
+
+
+async def serve(host="127.0.0.1", port=8765, workers=2, queue_size=16, cache_size=32):
+    service = SummaryService(workers=workers, queue_size=queue_size, cache_size=cache_size)
+    await service.start()
+    server = await asyncio.start_server(service.handle, host, port, limit=MAX_BODY_BYTES)
+    print(f"GW Analyzer service on http://{host}:{port} ({workers} workers, queue {queue_size})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GW Analyzer HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2, help="worker processes")
+    parser.add_argument("--queue-size", type=int, default=16, help="max queued jobs before returning 503")
+    parser.add_argument("--cache-size", type=int, default=32, help="recent results kept for identical requests")
+    parser.add_argument("--aliases", help="site analyte alias table (Canonical, Alias) applied to every job")
+    args = parser.parse_args()
+    if args.aliases:
+        # Inherited by the worker processes
+        os.environ[OVERRIDES_ENV] = os.path.abspath(args.aliases)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.queue_size, args.cache_size))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
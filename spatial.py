@@ -0,0 +1,142 @@
+from collections import OrderedDict
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Colour stops (viridis-like) used to render grids without a plotting library
+_STOPS = np.array([
+    [68, 1, 84],
+    [59, 82, 139],
+    [33, 145, 140],
+    [94, 201, 98],
+    [253, 231, 37],
+], dtype=float)
+
+
+def make_grid(xy, nx=500, ny=500, pad=0.05):
+    """
+    Regular grid axes covering the well locations plus a margin.
+    """
+    xy = np.asarray(xy, dtype=float)
+    (x0, y0), (x1, y1) = xy.min(axis=0), xy.max(axis=0)
+    span = max(x1 - x0, y1 - y0, 1e-9)
+    x0, x1 = x0 - pad * span, x1 + pad * span
+    y0, y1 = y0 - pad * span, y1 + pad * span
+    return np.linspace(x0, x1, nx), np.linspace(y0, y1, ny)
+
+
+class IDWInterpolator:
+    """
+    Inverse-distance-weighted interpolation onto a fixed grid.
+
+    The KD-tree neighbour search depends only on the well locations and the
+    grid, so it runs once (in chunks of grid cells); every analyte/event
+    afterwards is a vectorized gather and weighted sum over those neighbours.
+    Analytes or events sampled at only some wells get their own neighbour
+    table built over just those wells, so every cell still draws on its
+    ``k`` nearest *sampled* wells. The most recent subset tables are kept
+    (keyed on the has-value mask), since a map usually flips between a few
+    analytes sampled at the same wells.
+    """
+
+    def __init__(self, xy, grid_x, grid_y, k=12, power=2.0, chunk_cells=65536, max_subsets=4):
+        self.xy = np.asarray(xy, dtype=float)
+        self.grid_x, self.grid_y = np.asarray(grid_x), np.asarray(grid_y)
+        self.shape = (len(self.grid_y), len(self.grid_x))
+        self.k, self.power = k, power
+        self.chunk_cells = chunk_cells
+        self.max_subsets = max_subsets
+
+        gx, gy = np.meshgrid(self.grid_x, self.grid_y)
+        self._cells = np.column_stack([gx.ravel(), gy.ravel()])
+        self.weights, self.idx = self._neighbours(self.xy)
+        self._subsets = OrderedDict()
+
+    def _neighbours(self, xy):
+        k = min(self.k, len(xy))
+        cells = self._cells
+        tree = cKDTree(xy)
+        dist = np.empty((len(cells), k), dtype=np.float64)
+        idx = np.empty((len(cells), k), dtype=np.int64)
+        for start in range(0, len(cells), self.chunk_cells):
+            d, i = tree.query(cells[start:start + self.chunk_cells], k=k, workers=-1)
+            dist[start:start + self.chunk_cells] = np.asarray(d).reshape(-1, k)
+            idx[start:start + self.chunk_cells] = np.asarray(i).reshape(-1, k)
+
+        # A cell sitting on a well takes that well's value; weights are scaled
+        # per cell before the float32 cast so that huge weight cannot overflow
+        eps = 1e-12 * max(np.ptp(self.grid_x), np.ptp(self.grid_y), 1.0)
+        weights = 1.0 / np.maximum(dist, eps) ** self.power
+        weights = (weights / weights.max(axis=1, keepdims=True)).astype(np.float32)
+        return weights, idx.astype(np.int32)
+
+    def _table(self, has_value):
+        if has_value.all():
+            return self.weights, self.idx
+        key = has_value.tobytes()
+        if key in self._subsets:
+            self._subsets.move_to_end(key)
+        else:
+            self._subsets[key] = self._neighbours(self.xy[has_value])
+            if len(self._subsets) > self.max_subsets:
+                self._subsets.popitem(last=False)
+        return self._subsets[key]
+
+    def interpolate(self, values):
+        """
+        Interpolate per-well ``values`` (NaN = no data) onto the grid.
+        """
+        values = np.asarray(values, dtype=float)
+        has_value = ~np.isnan(values)
+        if not has_value.any():
+            return np.full(self.shape, np.nan)
+        weights_all, idx_all = self._table(has_value)
+        sampled = values[has_value].astype(np.float32)
+
+        out = np.empty(len(idx_all), dtype=float)
+        for start in range(0, len(idx_all), self.chunk_cells):
+            stop = start + self.chunk_cells
+            idx, weights = idx_all[start:stop], weights_all[start:stop]
+            num = np.einsum("ij,ij->i", weights, sampled[idx])
+            out[start:stop] = num / weights.sum(axis=1)
+        return out.reshape(self.shape)
+
+
+def colorize(grid, vmin=None, vmax=None, contour=None):
+    """
+    Map a 2D grid to an RGB uint8 image (north up).
+
+    NaN cells are left white. If ``contour`` is given, cells where the grid
+    crosses that level (e.g. an exceedance ratio of 1) are drawn in red.
+    """
+    vmin = np.nanmin(grid) if vmin is None else vmin
+    vmax = np.nanmax(grid) if vmax is None else vmax
+    scaled = (grid - vmin) / (vmax - vmin) if vmax > vmin else np.zeros_like(grid)
+    scaled = np.clip(np.nan_to_num(scaled), 0, 1) * (len(_STOPS) - 1)
+
+    low = np.floor(scaled).astype(int).clip(0, len(_STOPS) - 2)
+    frac = (scaled - low)[..., None]
+    rgb = _STOPS[low] * (1 - frac) + _STOPS[low + 1] * frac
+    rgb[np.isnan(grid)] = 255
+
+    if contour is not None:
+        above = np.nan_to_num(grid, nan=-np.inf) >= contour
+        edge = np.zeros_like(above)
+        edge[1:, :] |= above[1:, :] != above[:-1, :]
+        edge[:, 1:] |= above[:, 1:] != above[:, :-1]
+        rgb[edge] = (220, 20, 60)
+
+    return rgb[::-1].astype(np.uint8)
+
+
+def mark_points(rgb, xy, grid_x, grid_y, size=3):
+    """
+    Draw black squares at well locations on an image from ``colorize``.
+    """
+    rgb = rgb.copy()
+    n_rows, n_cols = rgb.shape[:2]
+    cols = np.searchsorted(grid_x, np.asarray(xy)[:, 0]).clip(0, n_cols - 1)
+    rows = (n_rows - 1 - np.searchsorted(grid_y, np.asarray(xy)[:, 1])).clip(0, n_rows - 1)
+    for r, c in zip(rows, cols):
+        rgb[max(r - size, 0):r + size + 1, max(c - size, 0):c + size + 1] = 0
+    return rgb
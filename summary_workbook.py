@@ -0,0 +1,174 @@
+"""
+Styled compliance workbook for the GWPS summary table.
+
+Highlighting is done with a handful of range-level conditional formats
+(one rule per category over the whole result block) that compare each
+cell with the row's GWPS column, instead of a style object per cell. The
+write cost is the same as an unstyled table, and the highlighting follows
+the numbers if a reviewer edits a result or a GWPS in Excel.
+"""
+from datetime import datetime
+
+import pandas as pd
+
+SUMMARY_COLUMNS = ("Min", "Max", "GWPS Exceedance")
+
+FILLS = {
+    "exceedance": {"bg_color": "#F8CBAD", "font_color": "#9C0006", "bold": True},
+    "nd_above_gwps": {"bg_color": "#FFE699", "font_color": "#7F6000"},
+    "nd": {"font_color": "#808080"},
+    "qualifier": {"bg_color": "#DDEBF7", "font_color": "#1F4E78"},
+    "no_gwps": {"font_color": "#808080", "italic": True},
+}
+
+# (format, sample cell, meaning)
+LEGEND = [
+    ("exceedance", "12", "Result above the GWPS"),
+    ("nd_above_gwps", "<20", "Non-detect with a reporting limit above the GWPS"),
+    ("nd", "<0.002", "Non-detect (<reporting limit)"),
+    ("qualifier", "0.5 J", "Qualified or non-numeric result (e.g. J flag, NA)"),
+    ("no_gwps", "Analyte", "No GWPS for this analyte"),
+]
+
+
+def _result_rules(first, gwps):
+    # Formulas are written relative to the top-left cell of the range and
+    # applied by Excel to every cell in it; results stay text as reported
+    # (trailing zeros matter), so they are compared through VALUE().
+    value = f"IFERROR(VALUE({first}),\"\")"
+    limit = f"IFERROR(VALUE(MID({first},2,99)),\"\")"
+    return [
+        ("exceedance", f"=AND(ISNUMBER({gwps}),ISNUMBER({value}),{value}>{gwps})"),
+        ("nd_above_gwps", f"=AND(ISNUMBER({gwps}),LEFT({first},1)=\"<\",ISNUMBER({limit}),{limit}>{gwps})"),
+        ("nd", f"=OR(LEFT({first},1)=\"<\",UPPER({first})=\"ND\",{first}=\"100% ND\")"),
+        ("qualifier", f"=AND(LEN({first})>0,NOT(ISNUMBER(VALUE({first}))))"),
+    ]
+
+
+def write_summary_workbook(summary, output, notes=None):
+    """
+    Write a ``generate_gw_summary`` table as a styled compliance workbook.
+
+    Parameters
+    ----------
+    summary : pd.DataFrame
+        Summary table (analytes x wells plus Min/Max/GWPS Exceedance). The
+        GWPS values are taken from ``attrs["gwps"]`` when present.
+    output : path or file-like
+        Destination workbook
+    notes : list[str] or None
+        Extra lines for the Notes sheet
+
+    Returns
+    -------
+    output
+    """
+    import xlsxwriter
+    from xlsxwriter.utility import xl_col_to_name, xl_rowcol_to_cell
+
+    gwps = pd.Series(summary.attrs.get("gwps", {}), dtype=float).reindex(summary.index)
+    result_cols = [c for c in summary.columns if c not in SUMMARY_COLUMNS]
+    extra_cols = [c for c in SUMMARY_COLUMNS if c in summary.columns]
+    header = [summary.index.name or "Analyte", "GWPS"] + [str(c) for c in result_cols] + extra_cols
+    # Well results plus Min/Max get the result highlighting
+    styled_cols = len(result_cols) + len({"Min", "Max"} & set(extra_cols))
+    n_rows = len(summary)
+
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True, "in_memory": False})
+    fills = {name: workbook.add_format(spec) for name, spec in FILLS.items()}
+    header_fmt = workbook.add_format({"bold": True, "bg_color": "#D9D9D9", "border": 1, "text_wrap": True})
+    yes_fmt = workbook.add_format({"bold": True, "font_color": "#9C0006", "bg_color": "#F8CBAD"})
+
+    # ------------------------------------------------------------
+    # Summary sheet
+    # ------------------------------------------------------------
+    sheet = workbook.add_worksheet("Summary")
+    sheet.freeze_panes(1, 2)
+    sheet.set_column(0, 0, 28)
+    sheet.set_column(1, len(header) - 1, 11)
+    sheet.write_row(0, 0, header, header_fmt)
+
+    # Rows are streamed in order (constant-memory mode)
+    table = summary[result_cols + extra_cols]
+    cells = table.astype(object).where(table.notna(), None).to_numpy()
+    for row, (analyte, limit, values) in enumerate(zip(summary.index, gwps.to_numpy(), cells), start=1):
+        sheet.write_string(row, 0, str(analyte))
+        if pd.notna(limit):
+            sheet.write_number(row, 1, float(limit))
+        for col, value in enumerate(values, start=2):
+            if value is not None:
+                sheet.write_string(row, col, str(value))
+
+    if n_rows:
+        last_row = n_rows
+        first_col, last_col = 2, 1 + styled_cols
+        first_cell = xl_rowcol_to_cell(1, first_col)
+        gwps_cell = xl_rowcol_to_cell(1, 1, col_abs=True)
+
+        if last_col >= first_col:
+            for name, formula in _result_rules(first_cell, gwps_cell):
+                sheet.conditional_format(1, first_col, last_row, last_col, {
+                    "type": "formula",
+                    "criteria": formula,
+                    "format": fills[name],
+                    "stop_if_true": True,
+                })
+            sheet.ignore_errors({
+                "number_stored_as_text": f"{xl_col_to_name(first_col)}2:{xl_col_to_name(last_col)}{last_row + 1}",
+            })
+
+        sheet.conditional_format(1, 0, last_row, 1, {
+            "type": "formula",
+            "criteria": f"=NOT(ISNUMBER({gwps_cell}))",
+            "format": fills["no_gwps"],
+        })
+
+        if "GWPS Exceedance" in extra_cols:
+            exc_col = header.index("GWPS Exceedance")
+            sheet.conditional_format(1, exc_col, last_row, exc_col, {
+                "type": "cell",
+                "criteria": "==",
+                "value": '"Yes"',
+                "format": yes_fmt,
+            })
+
+        sheet.autofilter(0, 0, last_row, len(header) - 1)
+
+    # ------------------------------------------------------------
+    # Notes sheet
+    # ------------------------------------------------------------
+    notes_sheet = workbook.add_worksheet("Notes")
+    notes_sheet.set_column(0, 0, 10)
+    notes_sheet.set_column(1, 1, 90)
+    bold = workbook.add_format({"bold": True})
+
+    lines = [
+        f"Generated {datetime.now():%Y-%m-%d %H:%M}",
+        f"{n_rows:,} analytes x {len(result_cols):,} wells",
+        "Results are shown as reported; non-detects as <reporting limit.",
+        "Highlighting compares each result with the GWPS in column B and updates if either is edited.",
+        "GWPS Exceedance = any result, or any non-detect reporting limit, above the GWPS.",
+    ]
+    no_gwps = gwps.index[gwps.isna()].tolist()
+    if no_gwps:
+        lines.append("No GWPS: " + ", ".join(map(str, no_gwps)))
+    unmatched = summary.attrs.get("unmatched_analytes", [])
+    if unmatched:
+        lines.append("Analyte names not found in the alias or GWPS table: " + ", ".join(unmatched))
+    lines.extend(notes or [])
+
+    notes_sheet.write(0, 0, "Notes", bold)
+    row = 1
+    for line in lines:
+        notes_sheet.write(row, 1, line)
+        row += 1
+
+    row += 1
+    notes_sheet.write(row, 0, "Legend", bold)
+    for name, sample, label in LEGEND:
+        row += 1
+        notes_sheet.write_string(row, 0, sample, fills[name])
+        notes_sheet.write(row, 1, label)
+
+    workbook.close()
+    return output
@@ -0,0 +1,184 @@
+import altair as alt
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core import build_gwps_lookup
+from format_dataset import DL_COLUMN, LONG_COLUMNS, long_data_source
+from ingest import UPLOAD_TYPES, coerce_dates
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the positions of ``n_out`` points of (x, y) (x sorted ascending)
+    that keep the visual shape of the series: the first and last points plus,
+    for every bucket in between, the point forming the largest triangle with
+    the previously kept point and the average of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    picked = np.empty(n_out, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def prepare_series(long_df):
+    """
+    Parse a long-format frame once for charting.
+
+    Returns the frame sorted by (well, constituent, date) with numeric
+    ``Value`` and ``ND`` flag, and a dict mapping (well, constituent) to the
+    row positions of that series. A non-detect's value is its reporting
+    limit: the "<DL" text, or for a bare "ND" the optional reporting-limit
+    column. Non-detects without a limit are kept with a NaN value; only rows
+    without a date or with non-numeric, non-ND text are dropped.
+    """
+    df = long_df[[c for c in LONG_COLUMNS + [DL_COLUMN] if c in long_df.columns]].copy()
+    df["Date"] = pd.to_datetime(coerce_dates(df["Date"]), errors="coerce")
+
+    codes, uniques = pd.factorize(df["Result"])
+    text = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    nd = (text.str.upper().eq("ND") | text.str.startswith("<")).to_numpy()
+    value = pd.to_numeric(text.str.lstrip("<").str.strip(), errors="coerce").to_numpy()
+    df["ND"] = np.append(nd, False)[codes]
+    df["Value"] = np.append(value, np.nan)[codes]
+    if DL_COLUMN in df.columns:
+        limit = pd.to_numeric(df.pop(DL_COLUMN), errors="coerce")
+        df["Value"] = df["Value"].where(~(df["ND"] & df["Value"].isna()), limit)
+
+    df = df[df["Date"].notna() & (df["Value"].notna() | df["ND"])]
+    df = df.sort_values(["Well ID", "Constituent", "Date"], kind="stable").reset_index(drop=True)
+    positions = df.groupby(["Well ID", "Constituent"], sort=False).indices
+    return df, positions
+
+
+def downsample_series(series, max_points):
+    """
+    Downsample detections and non-detects of one series separately with LTTB,
+    splitting the point budget in proportion to their counts.
+    """
+    parts = []
+    for _, part in series.groupby("ND", sort=False):
+        budget = max(3, round(max_points * len(part) / len(series)))
+        x = part["Date"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        keep = lttb_indices(x, part["Value"].to_numpy(), budget)
+        parts.append(part.iloc[keep])
+    return pd.concat(parts) if parts else series
+
+
+def timeseries_app():
+    st.title("📉 Concentration Time Series")
+
+    # --------------------------------------------------------------
+    # 1) Data source: the Format Dataset long table or an upload
+    # --------------------------------------------------------------
+    long_df, token = long_data_source("ts")
+    if long_df is None:
+        return
+
+    # Parsing, sorting and the per-series index are built once per dataset
+    if st.session_state.get("ts_token") != token:
+        st.session_state.ts_series = prepare_series(long_df)
+        st.session_state.ts_token = token
+    data, positions = st.session_state.ts_series
+
+    if data.empty:
+        st.warning("No rows with a parseable date and a numeric or non-detect result.")
+        return
+
+    # --------------------------------------------------------------
+    # 2) Selection
+    # --------------------------------------------------------------
+    analytes = sorted(data["Constituent"].astype(str).unique())
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        analyte = st.selectbox("Constituent", analytes)
+    wells_for_analyte = sorted({w for (w, a) in positions if a == analyte})
+    with col2:
+        wells = st.multiselect("Wells", wells_for_analyte, default=wells_for_analyte[:5])
+
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        max_points = st.number_input(
+            "Max points per series", min_value=100, max_value=20000, value=1500, step=100,
+            help="Longer series are downsampled with LTTB, which keeps peaks and trends.",
+        )
+    with col2:
+        gwps_file = st.file_uploader("GWPS table (optional, adds a reference line)", type=UPLOAD_TYPES, key="ts_gwps")
+
+    if not wells:
+        st.info("Select at least one well.")
+        return
+
+    # --------------------------------------------------------------
+    # 3) Chart
+    # --------------------------------------------------------------
+    frames, total, no_limit = [], 0, 0
+    for well in wells:
+        series = data.iloc[positions[(well, analyte)]]
+        total += len(series)
+        plottable = series["Value"].notna()
+        no_limit += int((~plottable).sum())
+        if plottable.any():
+            frames.append(downsample_series(series[plottable], int(max_points)))
+
+    caption = f"Plotting {sum(len(f) for f in frames):,} of {total:,} results."
+    if no_limit:
+        caption += (
+            f" {no_limit:,} non-detects have no reporting limit and are not drawn;"
+            " pick a reporting-limit column to plot them."
+        )
+    st.caption(caption)
+    if not frames:
+        return
+
+    plot_df = pd.concat(frames)[["Well ID", "Date", "Value", "ND"]]
+    plot_df["Detection"] = np.where(plot_df["ND"], "Non-detect (at DL)", "Detect")
+
+    base = alt.Chart(plot_df).encode(
+        x=alt.X("Date:T", title="Date"),
+        y=alt.Y("Value:Q", title=analyte),
+        color=alt.Color("Well ID:N"),
+        tooltip=["Well ID:N", "Date:T", "Value:Q", "Detection:N"],
+    )
+    layers = [
+        base.transform_filter(alt.datum.ND == False).mark_line(point=True),  # noqa: E712
+        base.transform_filter(alt.datum.ND == True).mark_point(shape="triangle-down", filled=False, size=60),  # noqa: E712
+    ]
+
+    if gwps_file is not None:
+        gwps_lookup, index = build_gwps_lookup(gwps_file)
+        gwps_val = gwps_lookup.get(index.canonical(analyte, analyte), np.nan)
+        if pd.isna(gwps_val):
+            st.info(f"No GWPS found for {analyte}.")
+        else:
+            rule = pd.DataFrame({"GWPS": [gwps_val]})
+            layers.append(
+                alt.Chart(rule).mark_rule(color="red", strokeDash=[6, 4]).encode(
+                    y="GWPS:Q", tooltip=["GWPS:Q"]
+                )
+            )
+
+    st.altair_chart(alt.layer(*layers).interactive(), use_container_width=True)
+    st.caption("▼ hollow markers are non-detects plotted at the reporting limit; dashed red line is the GWPS.")